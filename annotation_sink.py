@@ -0,0 +1,179 @@
+# annotation_sink.py
+import os
+import json
+import datetime
+from typing import Dict, Iterator, List, Optional
+
+COCO_FILE = "coco_annotations.json"
+JSONL_FILE = "annotations.jsonl"
+
+
+def coco_header() -> dict:
+    """info/licenses sections as written by bproc.writer.write_coco_annotations."""
+    return {
+        "info": {
+            "description": "coco_annotations",
+            "url": "https://github.com/waspinator/pycococreator",
+            "version": "0.1.0",
+            "year": 2020,
+            "contributor": "Unknown",
+            "date_created": datetime.datetime.utcnow().isoformat(' ')
+        },
+        "licenses": [{
+            "id": 1,
+            "name": "Attribution-NonCommercial-ShareAlike License",
+            "url": "http://creativecommons.org/licenses/by-nc-sa/2.0/"
+        }],
+    }
+
+
+class CocoJsonSink:
+    """
+    Keeps the whole COCO dict in memory and rewrites coco_annotations.json on flush()
+    (the previous behaviour; every flush costs time proportional to the dataset size).
+    """
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(str(output_dir), COCO_FILE)
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.coco = json.load(f)
+        else:
+            self.coco = {**coco_header(), "categories": [], "images": [], "annotations": []}
+        self.next_image_id = max((img["id"] for img in self.coco["images"]), default=-1) + 1
+        self.next_annotation_id = max((a["id"] for a in self.coco["annotations"]), default=0) + 1
+        self._dirty = False
+
+    def append(self, image: dict, categories: List[dict], annotations: List[dict], payload: Optional[dict] = None):
+        self._dirty = True
+        self.next_image_id = max(self.next_image_id, image["id"] + 1)
+        self.coco["images"].append(image)
+        for cat in categories:
+            if cat not in self.coco["categories"]:
+                self.coco["categories"].append(cat)
+        for ann in annotations:
+            ann["id"] = self.next_annotation_id
+            self.next_annotation_id += 1
+            self.coco["annotations"].append(ann)
+
+    def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.coco, f)
+        os.replace(tmp, self.path)
+
+    def close(self):
+        self.flush()
+
+
+class JsonlSink:
+    """
+    Appends one line per image ({"image", "categories", "annotations"}) to annotations.jsonl,
+    so adding a frame costs the same no matter how large the dataset already is. close()
+    (or finalize_jsonl for a crashed run) turns the lines into coco_annotations.json once.
+
+    Ids continue after the ones already in the file. A coco_annotations.json written by
+    the JSON writer without a .jsonl next to it is converted first, so runs can be mixed.
+    """
+    def __init__(self, output_dir: str):
+        self.output_dir = str(output_dir)
+        self.path = os.path.join(self.output_dir, JSONL_FILE)
+        legacy = os.path.join(self.output_dir, COCO_FILE)
+        if not os.path.exists(self.path) and os.path.exists(legacy):
+            coco_to_jsonl(legacy, self.path)
+        self.next_image_id, self.next_annotation_id = 0, 1
+        if os.path.exists(self.path):
+            _drop_partial_line(self.path)
+            # one pass when the session starts, appends never read the file again
+            for record in iter_jsonl(self.path):
+                self.next_image_id = max(self.next_image_id, record["image"]["id"] + 1)
+                for ann in record["annotations"]:
+                    self.next_annotation_id = max(self.next_annotation_id, ann["id"] + 1)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def append(self, image: dict, categories: List[dict], annotations: List[dict], payload: Optional[dict] = None):
+        for ann in annotations:
+            ann["id"] = self.next_annotation_id
+            self.next_annotation_id += 1
+        self.next_image_id = max(self.next_image_id, image["id"] + 1)
+        self._file.write(json.dumps({"image": image, "categories": categories, "annotations": annotations}) + "\n")
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+        finalize_jsonl(self.path, os.path.join(self.output_dir, COCO_FILE))
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Records of an annotations.jsonl; a truncated last line (crash mid-write) is skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield json.loads(line)
+
+
+def finalize_jsonl(jsonl_path: str, coco_path: str):
+    """
+    Write coco_annotations.json from an annotations.jsonl in two streaming passes
+    (images + categories, then annotations), without holding the dataset in memory.
+    """
+    categories: Dict[int, dict] = {}
+    tmp = coco_path + ".tmp"
+    num_images = num_annotations = 0
+    with open(tmp, "w", encoding="utf-8") as out:
+        header = coco_header()
+        out.write('{"info": %s, "licenses": %s, "images": [' % (json.dumps(header["info"]), json.dumps(header["licenses"])))
+        for record in iter_jsonl(jsonl_path):
+            out.write(("," if num_images else "") + json.dumps(record["image"]))
+            num_images += 1
+            for cat in record["categories"]:
+                categories.setdefault(cat["id"], cat)
+        out.write('], "annotations": [')
+        for record in iter_jsonl(jsonl_path):
+            for ann in record["annotations"]:
+                out.write(("," if num_annotations else "") + json.dumps(ann))
+                num_annotations += 1
+        out.write('], "categories": %s}' % json.dumps(list(categories.values())))
+    os.replace(tmp, coco_path)
+    print(f"[info] Wrote {num_images} images / {num_annotations} annotations to {coco_path}")
+
+
+def coco_to_jsonl(coco_path: str, jsonl_path: str):
+    with open(coco_path, "r", encoding="utf-8") as f:
+        coco = json.load(f)
+    by_image: Dict[int, list] = {}
+    for ann in coco["annotations"]:
+        by_image.setdefault(ann["image_id"], []).append(ann)
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for image in sorted(coco["images"], key=lambda img: img["id"]):
+            anns = by_image.get(image["id"], [])
+            cats = [c for c in coco["categories"] if c["id"] in {a["category_id"] for a in anns}]
+            f.write(json.dumps({"image": image, "categories": cats, "annotations": anns}) + "\n")
+
+
+def _drop_partial_line(path: str):
+    # a crash mid-write leaves a line without "\n"; cut it so appends start on a fresh line
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = size
+        while pos > 0:
+            step = min(1 << 16, pos)
+            pos -= step
+            f.seek(pos)
+            nl = f.read(step).rfind(b"\n")
+            if nl >= 0:
+                f.truncate(pos + nl + 1)
+                return
+        f.truncate(0)
@@ -12,7 +12,48 @@ def parse_script_args():
         raw = raw[1:]
     parser = argparse.ArgumentParser()
     parser.add_argument("--num_views", type=int, default=3, help="number of camera views")
+    parser.add_argument("--num_scenes", type=int, default=1, help="number of scenes to generate in this Blender session (assets are loaded once)")
+    parser.add_argument("--output_dir", type=str, default="output/coco_data", help="where images and coco_annotations.json are written")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the run; every stage of scene i gets a seed derived from it and i, recorded in scenes.jsonl (random if not given)")
+    parser.add_argument("--first_scene", type=int, default=0, help="global index of the first scene of this run (shards, restarts, regenerating single scenes)")
+    parser.add_argument("--num_threads", type=int, default=0, help="CPU render threads for Cycles (0 = available CPUs / --workers_per_machine)")
+    parser.add_argument("--workers_per_machine", type=int, default=1, help="number of co-located render processes sharing this machine")
+    parser.add_argument("--worker_index", type=int, default=0, help="index of this process among the co-located workers (used with --pin_cpus)")
+    parser.add_argument("--pin_cpus", action='store_true', help="pin this worker to its own slice of CPUs")
+    parser.add_argument("--tile_size", type=int, default=0, help="fixed Cycles tile size in px (0 = Blender default)")
+    parser.add_argument("--asset_cache_dir", type=str, default=None, help="directory for pre-baked per-category .blend caches (built on first use)")
+    parser.add_argument("--objects_per_scene", type=int, default=0, help="class-balanced subset of loaded objects shown per scene, the rest is hidden (0 = all)")
+    parser.add_argument("--assets_per_scene", type=int, default=0, help="lazily import only this many manifest assets per scene (0 = load everything up front)")
+    parser.add_argument("--manifest", type=str, default="assets/manifest.json", help="asset manifest used by --assets_per_scene")
+    parser.add_argument("--max_rss_mb", type=float, default=0, help="stop after the scene that pushes the process above this resident memory, so scripts/launch_shards.py restarts the worker (0 = no limit)")
+    parser.add_argument("--asset_memory_mb", type=float, default=4096, help="memory budget for assets kept resident between scenes")
+    parser.add_argument("--lod_cache_dir", type=str, default=None, help="render heavy assets with decimated LODs cached in this directory, picked by camera distance")
+    parser.add_argument("--texture_cache_dir", type=str, default=None, help="use resolution-capped texture copies cached in this directory")
+    parser.add_argument("--max_background_texture", type=int, default=2048, help="longest side (px) of cached background images")
+    parser.add_argument("--max_room_texture", type=int, default=1024, help="longest side (px) of cached room material maps")
+    parser.add_argument("--max_object_texture", type=int, default=1024, help="longest side (px) of cached asset textures")
+    parser.add_argument("--room_materials", type=int, default=6, help="ccmaterials loaded per random room, reused across scenes (0 = load all)")
+    parser.add_argument("--furniture_cache_dir", type=str, default="cache/pix3d", help="where preprocessed Pix3D furniture is cached as .blend")
+    parser.add_argument("--room_library", type=str, default=None, help="with --random_room: pick rooms from this prebuilt library (missing rooms are built first)")
+    parser.add_argument("--room_library_size", type=int, default=20, help="number of rooms the --room_library should contain")
+    parser.add_argument("--render_preset", choices=["baseline", "draft", "train", "showcase"], default="baseline", help="render quality preset (samples, noise threshold, bounces, caustics, resolution, denoiser); the default 'baseline' keeps the original 1024 samples at 1024x1024, 'train' is much faster")
+    parser.add_argument("--benchmark_presets", action='store_true', help="render the first scene with every preset, report s/frame and mask agreement, then exit")
+    parser.add_argument("--single_pass_segmap", action='store_true', help="take instance/class masks from the object index pass of the main render instead of a second segmap render")
+    parser.add_argument("--render_chunk_size", type=int, default=0, help="render, write and free this many views at a time to bound memory (0 = all views of a scene at once)")
+    parser.add_argument("--writer_threads", type=int, default=0, help="encode images and annotations on this many background threads while the next scene renders (0 = write synchronously)")
+    parser.add_argument("--annotation_format", choices=["json", "jsonl", "tar"], default="json", help="jsonl: append one line per image to annotations.jsonl and write coco_annotations.json once at exit (constant cost per frame); tar: WebDataset-style tar shards in <output_dir>/shards")
+    parser.add_argument("--shard_size", type=int, default=1000, help="images per tar shard with --annotation_format tar")
+    parser.add_argument("--shard_masks", action='store_true', help="also store the instance segmap of every image in the tar shards")
+    parser.add_argument("--min_visible_pixels", type=int, default=1, help="do not annotate instances with fewer visible pixels than this")
+    parser.add_argument("--occlusion_stats", action='store_true', help="add an estimated occlusion ratio to every annotation (uses the background writer)")
+    parser.add_argument("--min_visible_objects", type=int, default=0, help="resample camera poses before rendering until this many objects are in view and not fully occluded (0 = accept every pose)")
+    parser.add_argument("--min_object_fraction", type=float, default=0.0005, help="smallest projected bounding box (share of the image) for an object to count as in view")
+    parser.add_argument("--view_tries", type=int, default=25, help="camera poses tried per view before taking the best one")
+    parser.add_argument("--view_candidates", type=int, default=0, help="with --random_background: sample this many camera poses at once and keep the --num_views best covering, most diverse ones (0 = sample each view independently)")
     parser.add_argument("--apply_weathering", action='store_true', help="whether to apply random weathering to objects")
+    parser.add_argument("--shared_weathering", action='store_true', help="with --apply_weathering: reuse a small pool of noise textures, lattices and one dust node group instead of creating them per object")
+    parser.add_argument("--weathering_backend", choices=["modifiers", "numpy"], default="modifiers", help="with --apply_weathering: add deformation modifiers, or deform the vertex arrays directly with numpy (no modifier evaluation, undone between scenes)")
+    parser.add_argument("--weathering_variants_dir", type=str, default=None, help="with --apply_weathering: deform assets with shape variants baked by scripts/bake_weathering_variants.py instead of live modifiers")
     parser.add_argument("--random_background", action='store_true', help="whether to add a random background image")
     parser.add_argument("--random_room", action='store_true', help="whether to add a random room")
     return parser.parse_args(raw)
\ No newline at end of file
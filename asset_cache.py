@@ -0,0 +1,85 @@
+# asset_cache.py
+import os
+import json
+import hashlib
+import bpy
+import blenderproc as bproc
+from typing import List, Optional
+
+CACHE_VERSION = 1
+
+
+class AssetCache:
+    """
+    One pre-baked .blend per asset category: parts already joined, category custom
+    properties already set. A sidecar JSON stores a fingerprint of the source folder
+    (relative path, size and mtime of every file, incl. .mtl/textures), so editing or
+    adding an asset invalidates the category and it gets rebuilt on the next load.
+    Files are named <folder>_<hash of the absolute folder path>.blend/.json.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # -------- paths --------
+    def _key(self, asset_dir: str) -> str:
+        # folder name for readability, hash of the absolute path so equally named folders do not collide
+        asset_dir = os.path.abspath(os.path.normpath(str(asset_dir)))
+        return f"{os.path.basename(asset_dir)}_{hashlib.sha1(asset_dir.encode()).hexdigest()[:12]}"
+
+    def blend_path(self, asset_dir: str) -> str:
+        return os.path.join(self.cache_dir, self._key(asset_dir) + ".blend")
+
+    def meta_path(self, asset_dir: str) -> str:
+        return os.path.join(self.cache_dir, self._key(asset_dir) + ".json")
+
+    # -------- fingerprint --------
+    @staticmethod
+    def fingerprint(asset_dir: str) -> str:
+        h = hashlib.sha1(str(CACHE_VERSION).encode())
+        for root, _, filenames in sorted(os.walk(asset_dir)):
+            for f in sorted(filenames):
+                p = os.path.join(root, f)
+                st = os.stat(p)
+                h.update(f"{os.path.relpath(p, asset_dir)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+        return h.hexdigest()
+
+    def _read_meta(self, asset_dir: str) -> Optional[dict]:
+        try:
+            with open(self.meta_path(asset_dir), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self, asset_dir: str, category_id=None, category_name=None) -> bool:
+        meta = self._read_meta(asset_dir)
+        return (
+            meta is not None
+            and os.path.exists(self.blend_path(asset_dir))
+            and meta.get("fingerprint") == self.fingerprint(asset_dir)
+            and meta.get("category_id") == category_id
+            and meta.get("category_name") == category_name
+        )
+
+    # -------- build / load --------
+    def write(self, asset_dir: str, objs: List[bproc.types.MeshObject], category_id=None, category_name=None):
+        """Write already imported (and joined) objects of one category to the cache."""
+        blend_path = self.blend_path(asset_dir)
+        # absolute paths so external textures still resolve from the cache dir
+        bpy.data.libraries.write(blend_path, {o.blender_obj for o in objs}, path_remap="ABSOLUTE", fake_user=True)
+        meta = {
+            "version": CACHE_VERSION,
+            "fingerprint": self.fingerprint(asset_dir),
+            "category_id": category_id,
+            "category_name": category_name,
+            "sources": [o.get_cp("asset_source") for o in objs if o.has_cp("asset_source")],
+        }
+        with open(self.meta_path(asset_dir), "w") as f:
+            json.dump(meta, f, indent=2)
+        print(f"[info] Cached {len(objs)} assets from {asset_dir} -> {blend_path}")
+
+    def load(self, asset_dir: str) -> List[bproc.types.MeshObject]:
+        """Append all cached objects of a category, in source-path order."""
+        loaded = bproc.loader.load_blend(self.blend_path(asset_dir), obj_types=["mesh"])
+        mesh_objs = [o for o in loaded if isinstance(o, bproc.types.MeshObject)]
+        return sorted(mesh_objs, key=lambda o: o.get_cp("asset_source") if o.has_cp("asset_source") else o.get_name())
@@ -1,18 +1,25 @@
 # asset_loader.py
 import os
 import random
+import bpy
+import numpy as np
 import blenderproc as bproc
+from collections import OrderedDict
 from typing import List, Optional
 from weathering import Weathering
+from asset_cache import AssetCache
 
 class AssetLoader:
-    def __init__(self, asset_dir: Optional[str] = None):
+    def __init__(self, asset_dir: Optional[str] = None, cache_dir: Optional[str] = None):
         """
         If asset_dir provided here it will be used as default.
         load_assets can be called repeatedly for different folders;
         by default results are appended to all_loaded_groups.
+        If cache_dir is given, each category is imported from a pre-baked .blend
+        (built on the first load, rebuilt when the source folder changes).
         """
         self.asset_dir = asset_dir
+        self.cache = AssetCache(cache_dir) if cache_dir else None
         self.loaded_objs: List[List[bproc.types.MeshObject]] = []       # last load
         self.all_loaded_groups: List[List[bproc.types.MeshObject]] = []  # accumulated across calls
 
@@ -45,29 +52,80 @@ class AssetLoader:
             self.all_loaded_groups = []
 
         self.loaded_objs = []
+        # cached objects are already joined and carry their category custom properties
+        use_cache = self.cache is not None and group_parts_as_one and assign_cp
+        if use_cache and self.cache.is_valid(asset_dir, category_id, category_name):
+            for o in self.cache.load(asset_dir):
+                self.loaded_objs.append([o])
+                self.all_loaded_groups.append([o])
+            return self.loaded_objs
+
         for path in sorted(self._iter_asset_files(asset_dir)):
-            loaded = self._load_asset(path)
-            mesh_objs = [o for o in loaded if isinstance(o, bproc.types.MeshObject)]
-            if not mesh_objs:
+            group = self._import_group(path, category_id, category_name, assign_cp, group_parts_as_one)
+            if group is None:
                 continue
-            
-            if assign_cp and (category_id is not None or category_name is not None):
-                for o in mesh_objs:
-                    if category_id is not None:
-                        o.set_cp("category_id", category_id)
-                    if category_name is not None:
-                        o.set_cp("category_name", category_name)
-                    
-            if group_parts_as_one:
-                mesh_objs[0].join_with_other_objects(mesh_objs[1:])
-                self.loaded_objs.append([mesh_objs[0]])
-                self.all_loaded_groups.append([mesh_objs[0]])
-            else:
-                self.loaded_objs.append(mesh_objs)
-                self.all_loaded_groups.append(mesh_objs)
+            self.loaded_objs.append(group)
+            self.all_loaded_groups.append(group)
+
+        if use_cache and self.loaded_objs:
+            self.cache.write(asset_dir, [g[0] for g in self.loaded_objs], category_id, category_name)
 
         return self.loaded_objs
 
+    def _import_group(
+        self,
+        path: str,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        assign_cp: bool = True,
+        group_parts_as_one: bool = True,
+    ) -> Optional[List[bproc.types.MeshObject]]:
+        """Import one asset file; returns its MeshObjects (joined into one if group_parts_as_one) or None."""
+        loaded = self._load_asset(path)
+        mesh_objs = [o for o in loaded if isinstance(o, bproc.types.MeshObject)]
+        if not mesh_objs:
+            return None
+
+        for o in mesh_objs:
+            o.set_cp("asset_source", path)
+
+        if assign_cp and (category_id is not None or category_name is not None):
+            for o in mesh_objs:
+                if category_id is not None:
+                    o.set_cp("category_id", category_id)
+                if category_name is not None:
+                    o.set_cp("category_name", category_name)
+
+        if group_parts_as_one:
+            mesh_objs[0].join_with_other_objects(mesh_objs[1:])
+            return [mesh_objs[0]]
+        return mesh_objs
+
+    def measure_asset(self, path: str) -> Optional[dict]:
+        """Import one file, collect manifest stats (see AssetManifest) and free it again."""
+        group = self._import_group(path, assign_cp=False)
+        if group is None:
+            return None
+        obj = group[0]
+        mesh = obj.blender_obj.data
+        bb = np.asarray(obj.get_bound_box())
+        images = {
+            node.image for mat in mesh.materials if mat is not None and mat.use_nodes
+            for node in mat.node_tree.nodes if getattr(node, "image", None) is not None
+        }
+        stats = {
+            "n_vertices": len(mesh.vertices),
+            "n_faces": len(mesh.polygons),
+            "bbox_min": bb.min(axis=0).tolist(),
+            "bbox_max": bb.max(axis=0).tolist(),
+            # decoded RGBA; byte images take 1 byte per channel, float images 4
+            "texture_bytes": int(sum(img.size[0] * img.size[1] * 4 * (4 if img.is_float else 1) for img in images)),
+            # positions/normals per vertex plus loops/polys per face, roughly
+            "mesh_bytes": int(len(mesh.vertices) * 32 + len(mesh.loops) * 24 + len(mesh.polygons) * 16),
+        }
+        free_groups([group])
+        return stats
+
     def _load_asset(self, path: str):
         if path.lower().endswith(".obj"):
             return bproc.loader.load_obj(path)
@@ -103,17 +161,100 @@ class AssetLoader:
                     scale = random.uniform(*scale_interval)
                     bproc.material.add_dust(bp_mat, strength=strength, texture_scale=scale)
 
-    def apply_weathering(self, **kwargs):
+    def apply_weathering(self, groups=None, **kwargs):
         """
         Apply category-agnostic weathering (deforms + material aging).
-        kwargs are passed to Weathering(...).
+        groups defaults to all loaded groups; kwargs are passed to Weathering(...).
         """
-        groups = self.loaded_objs + [g for g in self.all_loaded_groups if g not in self.loaded_objs]
+        if groups is None:
+            groups = self.loaded_objs + [g for g in self.all_loaded_groups if g not in self.loaded_objs]
         Weathering(**kwargs).apply_to_groups(groups)
 
+    def clear_weathering(self, groups=None):
+        """
+        Remove live weathering modifiers from groups (default: all loaded groups), e.g. before
+        re-weathering for the next scene of a batch. Baked (applied) deformations cannot be undone.
+        """
+        Weathering.strip_groups(self.all_loaded_groups if groups is None else groups)
+
 
     def get_loaded_objs(self) -> List[List[bproc.types.MeshObject]]:
         return self.loaded_objs
 
     def get_all_loaded_groups(self) -> List[List[bproc.types.MeshObject]]:
         return self.all_loaded_groups
+
+
+class LazyAssetLoader:
+    """
+    Imports only the manifest entries a scene asks for and keeps recently used ones resident.
+    Residents are kept in LRU order; once their estimated footprint (texture_bytes + mesh_bytes
+    from the manifest) exceeds memory_budget_mb, the least recently used assets that are not part
+    of the current request are deleted together with their orphaned mesh/material/image data.
+    Residents that a scene did not request are hidden from rendering.
+
+    Assets are imported from their source files; the per-category .blend cache (--asset_cache_dir)
+    is not used here, since loading a category file would import every asset of the category.
+    """
+    def __init__(self, manifest, memory_budget_mb: float = 4096, loader: Optional[AssetLoader] = None):
+        self.manifest = manifest
+        self.memory_budget = int(memory_budget_mb * (1 << 20))
+        self.loader = loader or AssetLoader()
+        self.resident: "OrderedDict[str, List[bproc.types.MeshObject]]" = OrderedDict()
+        self.resident_bytes = 0
+        self._footprints = {e["path"]: self.manifest.footprint(e) for e in manifest.entries}
+
+    def acquire(self, entries: List[dict]) -> List[List[bproc.types.MeshObject]]:
+        """Return one group per entry, importing the ones that are not resident yet."""
+        groups = []
+        for e in entries:
+            key = e["path"]
+            if key in self.resident:
+                self.resident.move_to_end(key)
+            else:
+                group = self.loader._import_group(self.manifest.abs_path(e), e["class_id"], e["class_name"])
+                if group is None:
+                    print(f"[warn] No mesh objects in {key}, skipping")
+                    continue
+                self.resident[key] = group
+                self.resident_bytes += self._footprints.get(key, 0)
+            groups.append(self.resident[key])
+        requested = {e["path"] for e in entries}
+        self._evict(keep=requested)
+        # residents from earlier scenes stay where they were placed; keep them out of this one
+        for key, group in self.resident.items():
+            for o in group:
+                o.hide(key not in requested)
+        return groups
+
+    def sample(self, k: int, rng=random) -> List[List[bproc.types.MeshObject]]:
+        return self.acquire(self.manifest.sample(k, rng=rng))
+
+    def _evict(self, keep):
+        for key in list(self.resident):
+            if self.resident_bytes <= self.memory_budget:
+                break
+            if key in keep:
+                continue
+            free_groups([self.resident.pop(key)])
+            self.resident_bytes -= self._footprints.get(key, 0)
+
+
+def free_groups(groups):
+    """Delete the objects of groups and remove mesh/material/image datablocks left without users."""
+    meshes, mats, images = set(), set(), set()
+    for group in groups:
+        for o in group:
+            data = o.blender_obj.data
+            meshes.add(data)
+            for mat in data.materials:
+                if mat is None:
+                    continue
+                mats.add(mat)
+                if mat.use_nodes:
+                    images.update(n.image for n in mat.node_tree.nodes if getattr(n, "image", None) is not None)
+            o.delete()
+    for coll, blocks in ((bpy.data.meshes, meshes), (bpy.data.materials, mats), (bpy.data.images, images)):
+        for b in blocks:
+            if b.users == 0:
+                coll.remove(b)
@@ -0,0 +1,106 @@
+# asset_manifest.py
+import os
+import json
+import random
+import hashlib
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+ASSET_EXTS = (".obj", ".blend")
+
+
+def file_sha1(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetManifest:
+    """
+    Persisted index of every asset file (assets/manifest.json by default).
+
+    One entry per file:
+        path           relative to the asset root
+        class_id/class_name/class_dir   from configs/class_mapping.json
+        n_vertices/n_faces, bbox_min/bbox_max (after joining parts)
+        texture_bytes  decoded size of all images used by its materials
+        mesh_bytes     rough in-memory estimate of the mesh data
+        sha1, mtime    of the source file, used for incremental rebuilds
+    Reading the manifest needs no Blender; building it does (see build()).
+    """
+    def __init__(self, asset_root: str, entries: Optional[List[dict]] = None):
+        self.asset_root = str(asset_root)
+        self.entries: List[dict] = entries or []
+
+    # -------- io --------
+    @classmethod
+    def load(cls, path: str, asset_root: Optional[str] = None) -> "AssetManifest":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            raise RuntimeError(f"Unsupported manifest version in {path}; rebuild it.")
+        return cls(asset_root or data["asset_root"], data["assets"])
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "asset_root": self.asset_root, "assets": self.entries}, f, indent=1)
+
+    # -------- queries --------
+    def abs_path(self, entry: dict) -> str:
+        return os.path.join(self.asset_root, entry["path"])
+
+    def by_class(self) -> Dict[int, List[dict]]:
+        out: Dict[int, List[dict]] = {}
+        for e in self.entries:
+            out.setdefault(e["class_id"], []).append(e)
+        return out
+
+    def sample(self, k: int, rng=random) -> List[dict]:
+        """Uniformly sample k distinct entries."""
+        return rng.sample(self.entries, k=min(k, len(self.entries)))
+
+    @staticmethod
+    def footprint(entry: dict) -> int:
+        return int(entry.get("texture_bytes", 0)) + int(entry.get("mesh_bytes", 0))
+
+    # -------- build --------
+    def build(self, class_mappings: List[dict], loader):
+        """
+        (Re)scan asset_root/<class_dir> for every category and fill in per-asset stats.
+        Unchanged files (same mtime and size) keep their previous entry; everything else is
+        imported once through `loader` (an AssetLoader) to measure it, then freed.
+        Must run inside Blender.
+        """
+        previous = {e["path"]: e for e in self.entries}
+        entries = []
+        for category in class_mappings:
+            class_root = os.path.join(self.asset_root, category["class_dir"])
+            if not os.path.exists(class_root):
+                print(f"[warn] Category directory does not exist: {class_root}")
+                continue
+            for path in sorted(loader._iter_asset_files(class_root)):
+                rel = os.path.relpath(path, self.asset_root)
+                st = os.stat(path)
+                old = previous.get(rel)
+                if old and old.get("mtime") == st.st_mtime_ns and old.get("size") == st.st_size \
+                        and old.get("class_id") == category["class_id"]:
+                    entries.append(old)
+                    continue
+                stats = loader.measure_asset(path)
+                if stats is None:
+                    continue
+                entries.append({
+                    "path": rel,
+                    "class_id": category["class_id"],
+                    "class_name": category["class_name"],
+                    "class_dir": category["class_dir"],
+                    **stats,
+                    "sha1": file_sha1(path),
+                    "mtime": st.st_mtime_ns,
+                    "size": st.st_size,
+                })
+                print(f"[info] Indexed {rel}: {stats['n_faces']} faces, {stats['texture_bytes'] >> 20} MB textures")
+        self.entries = entries
+        return self
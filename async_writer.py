@@ -0,0 +1,127 @@
+# async_writer.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+import cv2
+from blenderproc.python.writer.CocoWriterUtility import _CocoWriterUtility
+from annotation_sink import CocoJsonSink
+from mask_stats import instance_stats, occlusion
+
+
+class AsyncCocoWriter:
+    """
+    Writes rendered frames and their COCO annotations on a background thread pool, so JPEG
+    encoding and mask encoding overlap with setting up and rendering the next scene.
+
+    Output matches bproc.writer.write_coco_annotations(append_to_existing_output=True):
+    images/<image_id>.jpg and coco_annotations.json with the same categories and ids.
+    Image ids are handed out at submit() time, so the result does not depend on which
+    thread finishes first. Finished frames go to the sink in id order on flush()
+    (see annotation_sink.py). submit() blocks while max_pending frames are queued, which
+    bounds the memory held by frames waiting for a slow disk. num_workers=0 writes inline.
+
+    Instances with fewer than min_visible_pixels pixels are not annotated. If surface
+    pixels (visibility.instance_surface_pixels) are passed to submit(), annotations get an
+    "occlusion" estimate in [0, 1].
+    """
+    def __init__(self, output_dir: str, num_workers: int = 2, max_pending: int = 16,
+                 jpg_quality: int = 95, mask_encoding_format: str = "rle", sink=None, min_visible_pixels: int = 1):
+        self.output_dir = str(output_dir)
+        self.min_visible_pixels = max(1, min_visible_pixels)
+        self.jpg_quality = jpg_quality
+        self.mask_encoding_format = mask_encoding_format
+        self.sink = sink if sink is not None else CocoJsonSink(self.output_dir)
+        if not getattr(self.sink, "stores_images", False):
+            os.makedirs(os.path.join(self.output_dir, "images"), exist_ok=True)
+        self.next_image_id = self.sink.next_image_id
+
+        self._pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="coco_writer") if num_workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pending = []  # futures in image id order
+
+    def submit(self, colors: List[np.ndarray], instance_segmaps: List[np.ndarray], instance_attribute_maps: List[dict],
+               surface_pixels: Optional[List[dict]] = None):
+        """Queue one rendered chunk (lists as returned by render/render_segmap)."""
+        surface_pixels = surface_pixels or [None] * len(colors)
+        for color, segmap, attributes, pixels in zip(colors, instance_segmaps, instance_attribute_maps, surface_pixels):
+            image_id = self.next_image_id
+            self.next_image_id += 1
+            if self._pool is None:
+                self.sink.append(*self._write_frame(image_id, color, segmap, attributes, pixels))
+                continue
+            self._slots.acquire()
+            future = self._pool.submit(self._write_frame, image_id, color, segmap, attributes, pixels)
+            future.add_done_callback(lambda _: self._slots.release())
+            self._pending.append(future)
+
+    def flush(self, wait: bool = True):
+        """
+        Hand finished frames (in id order) to the sink and flush it. With wait=False only
+        the frames finished so far are written and the rest stays queued.
+        """
+        self._drain(wait)
+        self.sink.flush()
+
+    def close(self):
+        self._drain(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+        self.sink.close()
+
+    # -------- internals --------
+    def _drain(self, wait: bool):
+        done = 0
+        for future in self._pending:
+            if not wait and not future.done():
+                break
+            self.sink.append(*future.result())
+            done += 1
+        del self._pending[:done]
+
+    def _write_frame(self, image_id: int, color: np.ndarray, segmap: np.ndarray, attributes: List[dict],
+                     pixels: Optional[dict] = None):
+        payload = {}
+        bgr = np.ascontiguousarray(color[..., :3][..., ::-1])
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpg_quality]
+        if getattr(self.sink, "stores_images", False):
+            # the sink keeps the encoded bytes (e.g. tar shards), nothing goes to images/
+            file_name = self.sink.file_name(image_id)
+            payload["jpg"] = cv2.imencode(".jpg", bgr, params)[1].tobytes()
+        else:
+            file_name = f"images/{image_id:06d}.jpg"
+            cv2.imwrite(os.path.join(self.output_dir, file_name), bgr, params)
+
+        image = _CocoWriterUtility.create_image_info(image_id, file_name, segmap.shape)
+        categories, annotations, instance_ids = {}, [], []
+        inst_to_cat = {}
+        for inst in attributes:
+            # category 0 is background, as in the bproc writer
+            if int(inst["category_id"]) != 0:
+                inst_to_cat[int(inst["idx"])] = int(inst["category_id"])
+        rle = self.mask_encoding_format == "rle"
+        h, w = segmap.shape
+        for inst, stats in instance_stats(segmap, with_rle=rle).items():
+            if inst not in inst_to_cat or stats["area"] < self.min_visible_pixels:
+                continue
+            cat = inst_to_cat[inst]
+            if rle:
+                ann = {"id": 0, "image_id": image_id, "category_id": cat, "iscrowd": 0, "area": stats["area"],
+                       "bbox": stats["bbox"], "segmentation": stats["rle"], "width": w, "height": h}
+            else:
+                ann = _CocoWriterUtility.create_annotation_info(0, image_id, cat, (segmap == inst).astype(np.uint8),
+                                                                self.mask_encoding_format)
+                if ann is None:
+                    continue
+            if pixels is not None and inst in pixels:
+                occ = occlusion(segmap, inst, pixels[inst])
+                if occ is not None:
+                    ann["occlusion"] = round(occ, 4)
+            annotations.append(ann)
+            instance_ids.append(inst)
+            categories[cat] = {"id": cat, "supercategory": "coco_annotations", "name": cat}
+        if getattr(self.sink, "store_masks", False):
+            payload["mask.png"] = cv2.imencode(".png", segmap.astype(np.uint16))[1].tobytes()
+            payload["mask_instance_ids"] = instance_ids
+        return image, list(categories.values()), annotations, payload
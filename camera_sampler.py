@@ -0,0 +1,94 @@
+# camera_sampler.py
+"""
+Batched camera pose sampling: thousands of candidate poses are generated, projected and
+scored with array operations, then a diverse top-N is selected.
+"""
+from typing import List, Optional
+import numpy as np
+
+
+def sph_to_cart_batch(radius: np.ndarray, az_deg: np.ndarray, el_deg: np.ndarray) -> np.ndarray:
+    """[N, 3] points, vectorized utility.sph_to_cart."""
+    az, el = np.deg2rad(az_deg), np.deg2rad(el_deg)
+    return np.stack([radius * np.cos(el) * np.cos(az),
+                     radius * np.cos(el) * np.sin(az),
+                     radius * np.sin(el)], axis=-1)
+
+
+def look_at_rotations(forward: np.ndarray, inplane_rot: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    [N, 3, 3] camera rotations looking along forward [N, 3] with the camera Y axis towards +Z,
+    i.e. bproc.camera.rotation_from_forward_vec(forward, inplane_rot=...) for every row.
+    forward must not be parallel to Z.
+    """
+    z = -forward / np.linalg.norm(forward, axis=1, keepdims=True)
+    x = np.cross([0.0, 0.0, 1.0], z)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    y = np.cross(z, x)
+    rot = np.stack([x, y, z], axis=2)
+    if inplane_rot is not None:
+        c, s = np.cos(inplane_rot), np.sin(inplane_rot)
+        rz = np.zeros((len(c), 3, 3))
+        rz[:, 0, 0], rz[:, 0, 1], rz[:, 1, 0], rz[:, 1, 1], rz[:, 2, 2] = c, -s, s, c, 1.0
+        rot = rot @ rz
+    return rot
+
+
+def orbit_candidates(center, base_radius: float, n: int, rng=np.random,
+                     radius_range=(0.9, 1.2), elevation_range=(10, 45)) -> np.ndarray:
+    """[n, 4, 4] cam2world poses distributed like Scene._sample_orbit_pose."""
+    center = np.asarray(center, dtype=np.float64)
+    radius = base_radius * rng.uniform(*radius_range, size=n)
+    cam_pos = center + sph_to_cart_batch(radius, rng.uniform(0, 360, size=n), rng.uniform(*elevation_range, size=n))
+    poses = np.tile(np.eye(4), (n, 1, 1))
+    poses[:, :3, :3] = look_at_rotations(center - cam_pos, rng.uniform(0, 2 * np.pi, size=n))
+    poses[:, :3, 3] = cam_pos
+    return poses
+
+
+def box_coverage(poses: np.ndarray, boxes: np.ndarray, K: np.ndarray, resolution) -> np.ndarray:
+    """
+    [N, M] share of the image covered by the projected bounding box of each of M objects
+    (boxes [M, 8, 3] world corners) for each of N poses (Blender camera axes), clipped to the
+    image. Objects with a corner behind the camera count as not covered.
+    """
+    w, h = resolution
+    rot_t = np.transpose(poses[:, :3, :3], (0, 2, 1))  # world2cam rotation
+    trans = -np.einsum("nij,nj->ni", rot_t, poses[:, :3, 3])
+    cam = np.einsum("nij,mkj->nmki", rot_t, boxes) + trans[:, None, None, :]
+    depth = -cam[..., 2]
+    safe = np.where(depth > 1e-6, depth, 1e-6)
+    x = K[0, 0] * cam[..., 0] / safe + K[0, 2]
+    y = K[1, 1] * -cam[..., 1] / safe + K[1, 2]
+    x0, x1 = np.clip(x.min(axis=2), 0, w), np.clip(x.max(axis=2), 0, w)
+    y0, y1 = np.clip(y.min(axis=2), 0, h), np.clip(y.max(axis=2), 0, h)
+    area = (x1 - x0) * (y1 - y0) / float(w * h)
+    return np.where((depth > 0).all(axis=2), area, 0.0)
+
+
+def score_views(coverage: np.ndarray, min_box_fraction: float = 0.0005, max_box_fraction: float = 0.25) -> np.ndarray:
+    """Objects in view (bbox >= min_box_fraction) plus their total image share, each capped at max_box_fraction."""
+    in_view = coverage >= min_box_fraction
+    return in_view.sum(axis=1) + np.where(in_view, np.minimum(coverage, max_box_fraction), 0.0).sum(axis=1)
+
+
+def diverse_order(poses: np.ndarray, scores: np.ndarray, center, k: int, spread_deg: float = 20.0) -> List[int]:
+    """
+    Greedy order of k candidate indices: each step takes the candidate with the best score
+    minus a penalty for viewing the center from a direction close to one already taken
+    (Gaussian in the angle, spread_deg wide), so views spread over azimuth and elevation.
+    """
+    dirs = poses[:, :3, 3] - np.asarray(center)
+    dirs /= np.linalg.norm(dirs, axis=1, keepdims=True)
+    scale = max(float(scores.max() - scores.min()), 1.0)
+    penalty = np.zeros(len(scores))
+    chosen: List[int] = []
+    sigma = np.deg2rad(spread_deg)
+    for _ in range(min(k, len(scores))):
+        value = scores - penalty
+        value[chosen] = -np.inf
+        best = int(np.argmax(value))
+        chosen.append(best)
+        angle = np.arccos(np.clip(dirs @ dirs[best], -1.0, 1.0))
+        penalty += scale * np.exp(-(angle / sigma) ** 2)
+    return chosen
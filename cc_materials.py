@@ -0,0 +1,105 @@
+# cc_materials.py
+import os
+import random
+from collections import OrderedDict
+from typing import List
+import bpy
+import blenderproc as bproc
+
+# same default selection as bproc.loader.load_ccmaterials(use_all_materials=False)
+PROBABLY_USEFUL = ["paving stones", "tiles", "wood", "fabric", "bricks", "metal", "wood floor",
+                   "ground", "rock", "concrete", "leather", "planks", "rocks", "gravel",
+                   "asphalt", "painted metal", "painted plaster", "marble", "carpet",
+                   "plastic", "roofing tiles", "bark", "metal plates", "wood siding",
+                   "terrazzo", "plaster", "paint", "corrugated steel", "painted wood",
+                   "lava cardboard", "clay", "diamond plate", "ice", "moss", "pipe", "candy",
+                   "chipboard", "rope", "sponge", "tactile paving", "paper", "cork",
+                   "wood chips"]
+
+
+def index_ccmaterials(folder: str, use_all_materials: bool = False, skip_transparent: bool = True) -> List[str]:
+    """
+    Names of the usable ambientCG materials in folder, applying the same rules as
+    load_ccmaterials (color map present, transparent ones skipped, default selection)
+    without loading any image.
+    """
+    prefixes = None if use_all_materials else [p.replace(" ", "") for p in PROBABLY_USEFUL]
+    names = []
+    for asset in sorted(os.listdir(folder)):
+        current = os.path.join(folder, asset)
+        if not os.path.isdir(current):
+            continue
+        if prefixes and not any(asset.lower().startswith(p) for p in prefixes):
+            continue
+        color = os.path.join(current, f"{asset}_2K_Color.jpg")
+        if not os.path.exists(color):
+            # newer ambientCG file names, load_ccmaterials falls back to them as well
+            color = os.path.join(current, f"{asset}_2K-JPG_Color.jpg")
+        if not os.path.exists(color):
+            continue
+        if skip_transparent and os.path.exists(color.replace("Color", "Opacity")):
+            continue
+        names.append(asset)
+    return names
+
+
+class CCMaterialPool:
+    """
+    Loads only the ccmaterials a room needs and keeps them for later rooms of the session.
+    At most max_resident materials are kept; the least recently used ones that no object
+    uses anymore are removed together with their images.
+    """
+    def __init__(self, folder: str, texture_cache=None, max_resident: int = 32):
+        self.folder = str(folder)
+        self.texture_cache = texture_cache
+        self.max_resident = max_resident
+        self.names = index_ccmaterials(self.folder)
+        if not self.names:
+            raise RuntimeError(f"No usable ccmaterials found in: {self.folder}")
+        self.loaded: "OrderedDict[str, bproc.types.Material]" = OrderedDict()
+
+    def sample(self, n: int, rng=random) -> List[bproc.types.Material]:
+        chosen = rng.sample(self.names, k=min(n, len(self.names)))
+        missing = [name for name in chosen if name not in self.loaded]
+        if missing:
+            folder = self.folder
+            if self.texture_cache is not None:
+                folder = self.texture_cache.mirror_dir(folder, "room", subdirs=missing)
+            existing = {m.as_pointer() for m in bpy.data.materials}
+            resident = {m.blender_obj.as_pointer() for m in self.loaded.values()}
+            # used_assets matches by prefix (Wood01 also loads Wood010), keep exact names only and
+            # drop the extra copies this call created, never a material that was there before
+            for mat in bproc.loader.load_ccmaterials(folder, used_assets=missing):
+                name = mat.blender_obj.get("asset_name", mat.get_name())
+                ptr = mat.blender_obj.as_pointer()
+                if name in missing and name not in self.loaded:
+                    self.loaded[name] = mat
+                elif ptr not in existing and ptr not in resident:
+                    self._remove(mat.blender_obj)
+        for name in chosen:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+        self._evict(keep=set(chosen))
+        materials = [self.loaded[name] for name in chosen if name in self.loaded]
+        if len(materials) < len(chosen):
+            print(f"[warn] Loaded {len(materials)} of {len(chosen)} ccmaterials from {self.folder}: "
+                  f"{sorted(set(chosen) - set(self.loaded))} did not load")
+        return materials
+
+    def _evict(self, keep):
+        for name in list(self.loaded):
+            if len(self.loaded) <= self.max_resident:
+                break
+            mat = self.loaded[name].blender_obj
+            if name in keep or mat.users > 0:
+                continue
+            self._remove(mat)
+            del self.loaded[name]
+
+    @staticmethod
+    def _remove(mat):
+        images = {n.image for n in mat.node_tree.nodes if getattr(n, "image", None) is not None}
+        bpy.data.materials.remove(mat)
+        for img in images:
+            if img.users == 0:
+                bpy.data.images.remove(img)
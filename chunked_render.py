@@ -0,0 +1,49 @@
+# chunked_render.py
+from contextlib import contextmanager
+import bpy
+import blenderproc as bproc
+
+
+@contextmanager
+def frame_range(start: int, end: int):
+    """Temporarily restrict the scene to frames [start, end)."""
+    scene = bpy.context.scene
+    old = scene.frame_start, scene.frame_end
+    scene.frame_start, scene.frame_end = start, end
+    try:
+        yield
+    finally:
+        scene.frame_start, scene.frame_end = old
+
+
+def render_chunks(chunk_size: int = 0, single_pass_segmap: bool = False, cpu_monitor=None):
+    """
+    Render the registered camera poses chunk_size frames at a time (0 = all at once).
+
+    Yields (frames, images, seg_data) per chunk, frames being the chunk's original frame
+    numbers (camera keyframes). While the consumer handles a chunk the scene's
+    frame range is 0..len(chunk), so bproc writers (which number their output from
+    frame_start and the files already written) see it as a standalone render. Only one
+    chunk of color/segmap arrays is alive at a time, so peak memory follows chunk_size
+    instead of --num_views.
+    """
+    scene = bpy.context.scene
+    first, last = scene.frame_start, scene.frame_end
+    chunk_size = chunk_size if chunk_size > 0 else max(1, last - first)
+    for start in range(first, last, chunk_size):
+        end = min(start + chunk_size, last)
+        with frame_range(start, end):
+            images = bproc.renderer.render()
+            if single_pass_segmap:
+                seg_data = images
+            else:
+                if cpu_monitor is not None:
+                    cpu_monitor.enabled = False
+                seg_data = bproc.renderer.render_segmap(map_by=["class", "instance"])
+                if cpu_monitor is not None:
+                    cpu_monitor.enabled = True
+        if chunk_size < last - first:
+            print(f"[info] Frames {start}-{end - 1} of {last - first}")
+        with frame_range(0, end - start):
+            yield range(start, end), images, seg_data
+        del images, seg_data
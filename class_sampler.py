@@ -0,0 +1,42 @@
+# class_sampler.py
+import random
+from typing import Dict, List
+
+
+class ClassBalancedSampler:
+    """
+    Picks k items per scene with classes drawn in proportion to target weights.
+
+    Weights come from the optional "weight" key of each entry in configs/class_mapping.json
+    (default 1.0, i.e. uniform over classes). Each pick draws a class by weight among the
+    classes that still have items, then one of its items, so frequent classes in the asset
+    library do not dominate the dataset. A pick only depends on the state of rng (reseeded
+    per scene, see seeding.py), never on earlier scenes; counts are kept for summary() only.
+    """
+    def __init__(self, class_mappings: List[dict], rng=random):
+        self.weights: Dict[int, float] = {c["class_id"]: float(c.get("weight", 1.0)) for c in class_mappings}
+        self.names: Dict[int, str] = {c["class_id"]: c["class_name"] for c in class_mappings}
+        self.counts: Dict[int, int] = {cid: 0 for cid in self.weights}
+        self.rng = rng
+
+    def pick(self, items_by_class: Dict[int, list], k: int) -> list:
+        """
+        Choose up to k distinct items from items_by_class ({class_id: [item, ...]}).
+        Classes with weight 0 or no items are never picked.
+        """
+        pools = {cid: list(items) for cid, items in items_by_class.items() if items and self.weights.get(cid, 0) > 0}
+        chosen = []
+        while pools and len(chosen) < k:
+            cids = list(pools)
+            cid = self.rng.choices(cids, weights=[self.weights[c] for c in cids])[0]
+            items = pools[cid]
+            chosen.append(items.pop(self.rng.randrange(len(items))))
+            self.counts[cid] = self.counts.get(cid, 0) + 1
+            if not items:
+                del pools[cid]
+        return chosen
+
+    def summary(self) -> str:
+        total = sum(self.counts.values()) or 1
+        return ", ".join(f"{self.names.get(cid, cid)}: {n} ({100.0 * n / total:.1f}%)"
+                         for cid, n in sorted(self.counts.items()) if n)
@@ -0,0 +1,120 @@
+# furniture_pool.py
+import os
+import glob
+import random
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional
+import bpy
+import numpy as np
+import blenderproc as bproc
+
+# hidden prototypes are parked far below the scene so ray casts and samplers never hit them
+_PARK_LOCATION = [0.0, 0.0, -1000.0]
+
+
+def find_pix3d_models(pix3d_dir) -> List[str]:
+    patterns = [
+        os.path.join(pix3d_dir, "*", "*.obj"),
+        os.path.join(pix3d_dir, "*", "*", "*.obj"),
+        os.path.join(pix3d_dir, "*", "*", "model.obj"),
+    ]
+    return sorted({p for pat in patterns for p in glob.glob(pat)})
+
+
+class FurniturePool:
+    """
+    Pix3D furniture, preprocessed once and instanced per room.
+
+    Every model is imported a single time: parts joined, rotation fixed, longest bbox side
+    scaled to 1 m and origin moved to the bottom, then saved as <cache_dir>/<model>_<key>.blend
+    (key = source path, size, mtime). Up to max_resident prototypes stay loaded (hidden and
+    parked out of the way); sample() returns linked duplicates with a random size in
+    target_longest_side_range, so building a room never re-parses an OBJ that is resident.
+    """
+    def __init__(self, pix3d_dir, cache_dir: Optional[str] = None, max_resident: int = 150):
+        self.pix3d_dir = str(pix3d_dir)
+        self.cache_dir = str(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_resident = max_resident
+        self.candidates = find_pix3d_models(self.pix3d_dir)
+        if not self.candidates:
+            raise RuntimeError(f"No OBJ files found under Pix3D dir: {self.pix3d_dir}")
+        self.prototypes: "OrderedDict[str, bproc.types.MeshObject]" = OrderedDict()
+
+    def sample(self, amount: int, target_longest_side_range=(1.0, 1.1), rng=random) -> List[bproc.types.MeshObject]:
+        chosen = rng.sample(self.candidates, k=min(amount, len(self.candidates)))
+        instances = []
+        for path in chosen:
+            proto = self._prototype(path)
+            if proto is None:
+                continue
+            inst = proto.duplicate(duplicate_children=False, linked=True)
+            inst.hide(False)
+            inst.set_location([0.0, 0.0, 0.0])
+            s = rng.uniform(*target_longest_side_range)
+            inst.set_scale([s, s, s])
+            instances.append(inst)
+        self._evict(keep=set(chosen))
+        return instances
+
+    # -------- internals --------
+    def _prototype(self, path: str) -> Optional[bproc.types.MeshObject]:
+        if path in self.prototypes:
+            self.prototypes.move_to_end(path)
+            return self.prototypes[path]
+        cache_path = self._cache_path(path)
+        if cache_path and os.path.exists(cache_path):
+            loaded = [o for o in bproc.loader.load_blend(cache_path, obj_types=["mesh"])
+                      if isinstance(o, bproc.types.MeshObject)]
+            proto = loaded[0] if loaded else None
+        else:
+            proto = self._import(path)
+            if proto is not None and cache_path:
+                bpy.data.libraries.write(cache_path, {proto.blender_obj}, path_remap="ABSOLUTE", fake_user=True)
+        if proto is None:
+            return None
+        proto.hide(True)
+        proto.set_location(_PARK_LOCATION)
+        self.prototypes[path] = proto
+        return proto
+
+    def _import(self, path: str) -> Optional[bproc.types.MeshObject]:
+        loaded = [o for o in bproc.loader.load_obj(path) if isinstance(o, bproc.types.MeshObject)]
+        if not loaded:
+            return None
+        proto = loaded[0]
+        proto.join_with_other_objects(loaded[1:])
+        # fix the rotation bug fixed by object import
+        proto.persist_transformation_into_mesh(location=False, rotation=True, scale=False)
+        bb = np.asarray(proto.get_bound_box())
+        longest = float((bb.max(axis=0) - bb.min(axis=0)).max())
+        if longest > 1e-6:
+            proto.set_scale([1.0 / longest] * 3)
+        proto.persist_transformation_into_mesh(location=False, rotation=False, scale=True)
+        # remove offset
+        proto.move_origin_to_bottom_mean_point()
+        proto.set_cp("dataset", "pix3d")
+        return proto
+
+    def _cache_path(self, path: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        st = os.stat(path)
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:12]
+        rel = os.path.relpath(os.path.dirname(path), self.pix3d_dir).replace(os.sep, "_")
+        return os.path.join(self.cache_dir, f"{rel}_{key}.blend")
+
+    def _evict(self, keep):
+        for path in list(self.prototypes):
+            if len(self.prototypes) <= self.max_resident:
+                break
+            if path in keep:
+                continue
+            proto = self.prototypes.pop(path)
+            mesh = proto.blender_obj.data
+            proto.delete()
+            # instances still in a room keep the mesh alive; it goes once they are deleted
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
@@ -0,0 +1,159 @@
+# lod.py
+import os
+import hashlib
+import bpy
+import numpy as np
+import blenderproc as bproc
+from typing import Dict, List
+
+
+def camera_positions() -> np.ndarray:
+    """[F, 3] world positions of the camera in every frame of the current scene."""
+    scene = bpy.context.scene
+    return np.array([bproc.camera.get_camera_pose(f)[:3, 3] for f in range(scene.frame_start, scene.frame_end)])
+
+
+class LodCache:
+    """
+    Decimated level-of-detail meshes for heavy assets, cached on disk.
+
+    prepare() gives every object with more than min_faces faces a list of meshes
+    (full mesh first, then one DECIMATE result per ratio). Generated levels are
+    written to <cache_dir>/<asset>_<key>.blend, keyed by the source file (path, size,
+    mtime) and the ratios, so they are only decimated once.
+
+    select() swaps each object's mesh data for the coarsest level that still has
+    about one face per px_per_face pixels of its projected area, seen from the closest
+    camera of the scene, so call it after the camera poses are set. Materials, custom
+    properties and live (unapplied) modifiers stay on the object, so masks are unchanged
+    up to sub-pixel silhouette differences. Weathering baked with apply_modifiers=True
+    only exists on the full mesh; numpy-backend weathering is replayed on the chosen level
+    by Weathering.follow_mesh_swaps(). restore() before weathering the next scene.
+    """
+    def __init__(self, cache_dir: str, ratios=(0.5, 0.2, 0.05), min_faces: int = 20000,
+                 min_lod_faces: int = 500, px_per_face: float = 2.0):
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.ratios = tuple(ratios)
+        self.min_faces = min_faces
+        self.min_lod_faces = min_lod_faces
+        self.px_per_face = px_per_face
+        self.levels: Dict[str, List[bpy.types.Mesh]] = {}   # object name -> meshes, most detailed first
+
+    # -------- preprocessing --------
+    def prepare(self, groups):
+        """Load (or build and cache) LODs for all heavy objects in groups that have none yet."""
+        self._prune()
+        for group in groups:
+            for obj in group:
+                bpy_obj = obj.blender_obj
+                if bpy_obj.name in self.levels or len(bpy_obj.data.polygons) <= self.min_faces:
+                    continue
+                path = self._cache_path(obj)
+                if os.path.exists(path):
+                    lods = self._load(path, bpy_obj.data)
+                else:
+                    lods = self._build(bpy_obj)
+                    bpy.data.libraries.write(path, set(lods), fake_user=True)
+                self.levels[bpy_obj.name] = [bpy_obj.data] + lods
+                # levels not shown in a scene have no users; keep them until _prune
+                for mesh in self.levels[bpy_obj.name]:
+                    mesh.use_fake_user = True
+
+    def _cache_path(self, obj) -> str:
+        bpy_obj = obj.blender_obj
+        src = obj.get_cp("asset_source") if obj.has_cp("asset_source") else None
+        h = hashlib.sha1(repr(self.ratios).encode())
+        if src and os.path.exists(src):
+            st = os.stat(src)
+            h.update(f"{os.path.abspath(src)}|{st.st_size}|{st.st_mtime_ns}".encode())
+            stem = os.path.splitext(os.path.basename(src))[0]
+        else:
+            # no source file to key on, fall back to the mesh itself
+            h.update(f"{bpy_obj.data.name}|{len(bpy_obj.data.vertices)}|{len(bpy_obj.data.polygons)}".encode())
+            stem = bpy_obj.data.name
+        return os.path.join(self.cache_dir, f"{stem}_{h.hexdigest()[:12]}.blend")
+
+    def _build(self, bpy_obj) -> List[bpy.types.Mesh]:
+        # decimate a temporary object sharing the mesh, so the asset itself is untouched
+        tmp = bpy.data.objects.new("lod_tmp", bpy_obj.data)
+        bpy.context.scene.collection.objects.link(tmp)
+        mod = tmp.modifiers.new(name="lod_decimate", type="DECIMATE")
+        lods = []
+        for i, ratio in enumerate(self.ratios):
+            mod.ratio = ratio
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            depsgraph.update()
+            mesh = bpy.data.meshes.new_from_object(tmp.evaluated_get(depsgraph))
+            if len(mesh.polygons) < self.min_lod_faces:
+                bpy.data.meshes.remove(mesh)
+                break
+            mesh.name = f"{bpy_obj.data.name}_lod{i + 1}"
+            lods.append(mesh)
+        bpy.data.objects.remove(tmp, do_unlink=True)
+        print(f"[info] Built {len(lods)} LODs for {bpy_obj.name} ({len(bpy_obj.data.polygons)} faces)")
+        return lods
+
+    def _load(self, path: str, full_mesh) -> List[bpy.types.Mesh]:
+        with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+            data_to.meshes = sorted(data_from.meshes)
+        lods = sorted(data_to.meshes, key=lambda m: len(m.polygons), reverse=True)
+        # point material slots at the already loaded materials and drop the appended copies
+        dupes = set()
+        for mesh in lods:
+            for i, mat in enumerate(mesh.materials):
+                if i < len(full_mesh.materials) and mat is not full_mesh.materials[i]:
+                    dupes.add(mat)
+                    mesh.materials[i] = full_mesh.materials[i]
+        for mat in dupes:
+            if mat is not None and mat.users == 0:
+                bpy.data.materials.remove(mat)
+        return lods
+
+    def _prune(self):
+        """Forget (and free) levels of objects that were deleted, e.g. evicted by LazyAssetLoader."""
+        for name in [n for n in self.levels if n not in bpy.data.objects]:
+            # the object only freed whichever level it was showing; the others are orphans now
+            for mesh in self.levels.pop(name):
+                try:
+                    mesh.use_fake_user = False
+                    if mesh.users == 0:
+                        bpy.data.meshes.remove(mesh)
+                except ReferenceError:
+                    pass
+
+    # -------- runtime --------
+    def select(self, groups, camera_positions: np.ndarray, keep_full=()):
+        """
+        Swap in the coarsest sufficient LOD per object, judged from the camera closest to its
+        bounding box (camera_positions [F, 3], see camera_positions()). Objects named in
+        keep_full (e.g. with a baked weathering shape that only exists on the full mesh) and
+        scenes without cameras keep the full-detail mesh.
+        """
+        if len(camera_positions) == 0:
+            return
+        focal_px = float(bproc.camera.get_intrinsics_as_K_matrix()[0, 0])
+        for group in groups:
+            for obj in group:
+                levels = self.levels.get(obj.blender_obj.name)
+                if not levels or obj.blender_obj.name in keep_full:
+                    continue
+                bb = np.asarray(obj.get_bound_box())
+                diag = float(np.linalg.norm(bb.max(axis=0) - bb.min(axis=0)))
+                nearest = float(np.linalg.norm(camera_positions - bb.mean(axis=0), axis=1).min())
+                distance = max(nearest - diag / 2, 1e-3)
+                projected_px = diag / distance * focal_px
+                budget = projected_px * projected_px / self.px_per_face
+                chosen = levels[0]
+                for mesh in levels:                 # most detailed first
+                    if len(mesh.polygons) >= budget:
+                        chosen = mesh
+                obj.blender_obj.data = chosen
+
+    def restore(self, groups):
+        """Put the full-detail meshes back."""
+        for group in groups:
+            for obj in group:
+                levels = self.levels.get(obj.blender_obj.name)
+                if levels:
+                    obj.blender_obj.data = levels[0]
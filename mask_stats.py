@@ -0,0 +1,112 @@
+# mask_stats.py
+"""
+Per-instance statistics of instance segmaps, computed for all instances of a frame at once.
+
+Only needs numpy, so it runs inline in trash_proc.py (writer threads) and in
+scripts/filter_annotations.py over existing output.
+"""
+from typing import Dict, List, Optional
+import numpy as np
+
+
+def instance_stats(segmap: np.ndarray, with_rle: bool = True) -> Dict[int, dict]:
+    """
+    {instance id: {"area", "bbox", "rle"}} for every non-zero id of an [H, W] segmap.
+
+    One pass over the column-major runs of the segmap: run boundaries come from a single
+    comparison of neighbouring pixels, runs are grouped by id with one sort, and areas,
+    bboxes ([x, y, w, h]) and COCO RLE counts are reduced per group. The results are
+    identical to bproc's per-instance binary_mask_to_rle / bbox_from_binary_mask.
+    """
+    h, w = segmap.shape
+    flat = segmap.ravel(order="F")
+    n = flat.size
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    ends = np.append(starts[1:], n)
+    values = flat[starts]
+
+    keep = values != 0
+    starts, ends, values = starts[keep], ends[keep], values[keep]
+    if values.size == 0:
+        return {}
+    order = np.argsort(values, kind="stable")  # stable keeps runs of an id in pixel order
+    starts, ends, values = starts[order], ends[order], values[order]
+    group = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+
+    # a run that wraps into the next column covers the full row range
+    x0, x1 = starts // h, (ends - 1) // h
+    wraps = x0 != x1
+    y0 = np.where(wraps, 0, starts % h)
+    y1 = np.where(wraps, h - 1, (ends - 1) % h)
+
+    areas = np.add.reduceat(ends - starts, group)
+    bx0, bx1 = np.minimum.reduceat(x0, group), np.maximum.reduceat(x1, group)
+    by0, by1 = np.minimum.reduceat(y0, group), np.maximum.reduceat(y1, group)
+
+    stats = {}
+    bounds = np.append(group, values.size)
+    for k, idx in enumerate(values[group]):
+        entry = {
+            "area": int(areas[k]),
+            "bbox": [int(bx0[k]), int(by0[k]), int(bx1[k] - bx0[k] + 1), int(by1[k] - by0[k] + 1)],
+        }
+        if with_rle:
+            s, e = starts[bounds[k]:bounds[k + 1]], ends[bounds[k]:bounds[k + 1]]
+            entry["rle"] = {"counts": _rle_counts(s, e, n), "size": [h, w]}
+        stats[int(idx)] = entry
+    return stats
+
+
+def _rle_counts(starts: np.ndarray, ends: np.ndarray, n: int) -> List[int]:
+    # alternating background/foreground run lengths, starting with background (may be 0)
+    gaps = starts - np.r_[0, ends[:-1]]
+    counts = np.empty(2 * starts.size, dtype=np.int64)
+    counts[0::2], counts[1::2] = gaps, ends - starts
+    counts = counts.tolist()
+    if ends[-1] < n:
+        counts.append(int(n - ends[-1]))
+    return counts
+
+
+def rle_area_bbox(rle: dict):
+    """area and [x, y, w, h] of a COCO RLE without decoding it to a mask."""
+    h, w = rle["size"]
+    counts = np.asarray(rle["counts"], dtype=np.int64)
+    bounds = np.cumsum(counts)
+    starts, ends = bounds[0::2][:len(counts[1::2])], bounds[1::2]
+    nonempty = ends > starts
+    starts, ends = starts[nonempty], ends[nonempty]
+    if starts.size == 0:
+        return 0, [0, 0, 0, 0]
+    x0, x1 = starts // h, (ends - 1) // h
+    wraps = x0 != x1
+    y0 = np.where(wraps, 0, starts % h).min()
+    y1 = np.where(wraps, h - 1, (ends - 1) % h).max()
+    return int((ends - starts).sum()), [int(x0.min()), int(y0), int(x1.max() - x0.min() + 1), int(y1 - y0 + 1)]
+
+
+def occlusion(segmap: np.ndarray, idx: int, pixels: np.ndarray) -> Optional[float]:
+    """
+    Share of an object's camera-facing surface points (projected to integer pixel
+    coordinates [N, 2] as (x, y), see visibility.py) that are covered by something else.
+    None if no point falls into the image.
+    """
+    if pixels.size == 0:
+        return None
+    h, w = segmap.shape
+    x, y = pixels[:, 0], pixels[:, 1]
+    inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+    if not inside.any():
+        return None
+    seen = segmap[y[inside], x[inside]] == idx
+    return float(1.0 - seen.mean())
+
+
+def drop_small_instances(segmap: np.ndarray, min_pixels: int) -> np.ndarray:
+    """Copy of segmap with every instance of fewer than min_pixels pixels set to background."""
+    counts = np.bincount(segmap.ravel())
+    small = np.flatnonzero((counts > 0) & (counts < min_pixels))
+    small = small[small != 0]
+    if small.size == 0:
+        return segmap
+    return np.where(np.isin(segmap, small), 0, segmap).astype(segmap.dtype)
@@ -0,0 +1,103 @@
+# mesh_deform.py
+"""
+Weathering deformations as array operations on [N, 3] local vertex positions.
+
+Counterparts of the modifiers weathering.py adds (DISPLACE with a CLOUDS texture,
+SIMPLE_DEFORM, LATTICE, axis scaling), so meshes can be deformed with one
+foreach_get/foreach_set round trip instead of modifier evaluation. Only needs numpy;
+all randomness comes from the rng passed in, so results are reproducible.
+"""
+from math import comb
+import numpy as np
+
+_AXES = {"X": [1, 2, 0], "Y": [2, 0, 1], "Z": [0, 1, 2]}  # column order that puts the deform axis last
+
+
+def value_noise(points: np.ndarray, rng, octaves: int = 3) -> np.ndarray:
+    """Smooth fractal noise in [0, 1] at points [N, 3] (lattice spacing 1), like Blender's CLOUDS texture."""
+    perm = rng.permutation(256)
+    values = rng.random(256)
+    total = np.zeros(len(points))
+    amp, norm = 1.0, 0.0
+    for octave in range(octaves):
+        q = points * (2.0 ** octave)
+        base = np.floor(q)
+        f = q - base
+        f = f * f * (3.0 - 2.0 * f)
+        i = base.astype(np.int64)
+        acc = np.zeros(len(points))
+        for dx in (0, 1):
+            hx = perm[(i[:, 0] + dx) & 255]
+            wx = f[:, 0] if dx else 1.0 - f[:, 0]
+            for dy in (0, 1):
+                hy = perm[(hx + i[:, 1] + dy) & 255]
+                wy = f[:, 1] if dy else 1.0 - f[:, 1]
+                for dz in (0, 1):
+                    h = perm[(hy + i[:, 2] + dz) & 255]
+                    wz = f[:, 2] if dz else 1.0 - f[:, 2]
+                    acc += wx * wy * wz * values[h]
+        total += amp * acc
+        norm += amp
+        amp *= 0.5
+    return total / norm
+
+
+def displace(co: np.ndarray, normals: np.ndarray, strength: float, noise_scale: float, rng,
+             mid_level: float = 0.5) -> np.ndarray:
+    """DISPLACE modifier: move each vertex along its normal by (noise - mid_level) * strength."""
+    noise = value_noise(co / max(noise_scale, 1e-6), rng)
+    return co + normals * ((noise - mid_level) * strength)[:, None]
+
+
+def simple_deform(co: np.ndarray, method: str, axis: str, amount: float) -> np.ndarray:
+    """
+    SIMPLE_DEFORM modifier around the origin. amount is the angle in radians over the
+    extent along axis for BEND/TWIST, and the factor for TAPER/STRETCH.
+    """
+    order = _AXES[axis]
+    x, y, z = co[:, order[0]], co[:, order[1]], co[:, order[2]]
+    if method in {"BEND", "TWIST"}:
+        extent = max(float(z.max() - z.min()), 1e-6) if method == "TWIST" else max(float(x.max() - x.min()), 1e-6)
+        factor = amount / extent
+        if method == "TWIST":
+            c, s = np.cos(z * factor), np.sin(z * factor)
+            x, y = x * c - y * s, x * s + y * c
+        elif abs(factor) > 1e-7:
+            c, s = np.cos(x * factor), np.sin(x * factor)
+            r = 1.0 / factor
+            x, y = -(y - r) * s, (y - r) * c + r
+    elif method == "TAPER":
+        scale = 1.0 + z * amount
+        x, y = x * scale, y * scale
+    elif method == "STRETCH":
+        scale = z * z * amount - amount + 1.0
+        x, y, z = x * scale, y * scale, z * (1.0 + amount)
+    else:
+        raise ValueError(f"Unknown deform method {method}")
+    out = np.empty_like(co)
+    out[:, order[0]], out[:, order[1]], out[:, order[2]] = x, y, z
+    return out
+
+
+def lattice_ffd(co: np.ndarray, offsets: np.ndarray, center: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """
+    Free-form deformation by a lattice of control point offsets [U, V, W, 3] spanning the box
+    center +- size / 2 (Bernstein weights). Vertices outside the box follow its nearest face.
+    """
+    s = np.clip((co - center) / np.maximum(size, 1e-9) + 0.5, 0.0, 1.0)
+    wu, wv, ww = (_bernstein(s[:, k], offsets.shape[k]) for k in range(3))
+    n = len(co)
+    # weight of every control point per vertex, flattened in the (u, v, w) order of offsets
+    weights = (wu[:, :, None] * wv[:, None, :]).reshape(n, -1)
+    weights = (weights[:, :, None] * ww[:, None, :]).reshape(n, -1)
+    return co + weights @ offsets.reshape(-1, 3)
+
+
+def _bernstein(t: np.ndarray, n: int) -> np.ndarray:
+    i = np.arange(n)
+    binom = np.array([comb(n - 1, k) for k in i], dtype=np.float64)
+    return binom * t[:, None] ** i * (1.0 - t[:, None]) ** (n - 1 - i)
+
+
+def axis_scale(co: np.ndarray, scale) -> np.ndarray:
+    return co * np.asarray(scale, dtype=co.dtype)
@@ -0,0 +1,129 @@
+# render_presets.py
+import json
+import os
+import time
+import bpy
+import numpy as np
+import blenderproc as bproc
+from blenderproc.python.utility.Utility import Utility
+
+# Cycles settings that are changed together. Samples are an upper bound: adaptive sampling
+# stops a pixel once its noise estimate is below noise_threshold, and the denoiser cleans up the rest.
+RENDER_PRESETS = {
+    # what trash_proc.py rendered before presets existed: 1024 samples, 1024x1024, bproc.init() defaults otherwise
+    "baseline": dict(samples=1024, noise_threshold=0.01, resolution=(1024, 1024), denoiser="INTEL", caustics=True,
+                     bounces=dict(diffuse_bounces=3, glossy_bounces=0, transmission_bounces=0,
+                                  transparent_max_bounces=8, max_bounces=3)),
+    # quick look at layouts/annotations
+    "draft": dict(samples=16, noise_threshold=0.1, resolution=(512, 512), denoiser="INTEL", caustics=False,
+                  bounces=dict(diffuse_bounces=1, glossy_bounces=1, transmission_bounces=2,
+                               transparent_max_bounces=4, max_bounces=2)),
+    # training data: denoised JPEGs at full resolution
+    "train": dict(samples=64, noise_threshold=0.05, resolution=(1024, 1024), denoiser="INTEL", caustics=False,
+                  bounces=dict(diffuse_bounces=2, glossy_bounces=2, transmission_bounces=4,
+                               transparent_max_bounces=8, max_bounces=4)),
+    # figures/README images: baseline samples with more bounces
+    "showcase": dict(samples=1024, noise_threshold=0.01, resolution=(1024, 1024), denoiser="INTEL", caustics=True,
+                     bounces=dict(diffuse_bounces=3, glossy_bounces=4, transmission_bounces=8,
+                                  transparent_max_bounces=8, max_bounces=8)),
+}
+
+
+def apply_render_preset(name: str):
+    """Configure samples, noise threshold, light bounces, caustics, resolution and denoiser."""
+    if name not in RENDER_PRESETS:
+        raise ValueError(f"Unknown render preset '{name}', choose from {sorted(RENDER_PRESETS)}")
+    p = RENDER_PRESETS[name]
+    bproc.renderer.set_max_amount_of_samples(p["samples"])
+    bproc.renderer.set_noise_threshold(p["noise_threshold"])
+    bproc.renderer.set_light_bounces(**p["bounces"])
+    bpy.context.scene.cycles.caustics_reflective = p["caustics"]
+    bpy.context.scene.cycles.caustics_refractive = p["caustics"]
+    bproc.renderer.set_denoiser(p["denoiser"])
+    bproc.camera.set_resolution(*p["resolution"])
+    return p
+
+
+def enable_index_pass_segmap():
+    """Output instance/class masks from the IndexOB pass of the color render (once per session)."""
+    if Utility.find_registered_output_by_key("segmap") is None:
+        bproc.renderer.enable_segmentation_output(map_by=["class", "instance"], default_values={"category_id": 0})
+
+
+def index_mesh_objects():
+    """
+    Number all mesh objects like enable_segmentation_output does (list index + 1), so objects
+    added since it was called (rooms, lazily loaded assets) get an index too. Call before rendering.
+    """
+    for i, obj in enumerate(bproc.object.get_all_mesh_objects()):
+        obj.blender_obj.pass_index = i + 1
+
+
+def _resize_nearest(segmap: np.ndarray, shape) -> np.ndarray:
+    rows = np.arange(shape[0]) * segmap.shape[0] // shape[0]
+    cols = np.arange(shape[1]) * segmap.shape[1] // shape[1]
+    return segmap[rows[:, None], cols[None, :]]
+
+
+def mask_agreement(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Mean per-instance IoU of candidate vs reference instance segmap (candidate resized if needed)."""
+    if candidate.shape != reference.shape:
+        candidate = _resize_nearest(candidate, reference.shape)
+    ious = []
+    for idx in np.unique(reference):
+        if idx == 0:  # background
+            continue
+        a, b = reference == idx, candidate == idx
+        union = np.logical_or(a, b).sum()
+        ious.append(np.logical_and(a, b).sum() / union if union else 1.0)
+    return float(np.mean(ious)) if ious else 1.0
+
+
+def rgb_psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """PSNR in dB of a candidate color image vs the reference (candidate resized if needed)."""
+    if candidate.shape[:2] != reference.shape[:2]:
+        candidate = _resize_nearest(candidate, reference.shape[:2])
+    mse = np.mean((reference[..., :3].astype(np.float64) - candidate[..., :3].astype(np.float64)) ** 2)
+    return float(10 * np.log10(255.0 ** 2 / mse)) if mse > 0 else float("inf")
+
+
+def benchmark_presets(names=None, reference: str = "showcase", output_path=None):
+    """
+    Render the current scene (all registered camera poses) once per preset and report
+    seconds/frame, the mean instance IoU of the masks from each preset's own render (IndexOB
+    pass, so anti-aliasing and resolution count) and the RGB PSNR, both against the reference
+    preset. Leaves the last preset applied.
+    Returns {preset: {"sec_per_frame": .., "mask_iou": .., "rgb_psnr": ..}}.
+    """
+    names = list(names or RENDER_PRESETS)
+    if reference not in names:
+        names.append(reference)
+    # render_segmap() is a separate pass that ignores the quality settings
+    enable_index_pass_segmap()
+    index_mesh_objects()
+    num_frames = max(1, bproc.utility.num_frames())
+    segmaps, colors, report = {}, {}, {}
+    for name in names:
+        apply_render_preset(name)
+        t0 = time.time()
+        data = bproc.renderer.render()
+        elapsed = time.time() - t0
+        segmaps[name], colors[name] = data["instance_segmaps"], data["colors"]
+        report[name] = {"sec_per_frame": elapsed / num_frames}
+
+    for name in names:
+        report[name]["mask_iou"] = float(np.mean([
+            mask_agreement(ref, cand) for ref, cand in zip(segmaps[reference], segmaps[name])
+        ]))
+        report[name]["rgb_psnr"] = float(np.mean([
+            rgb_psnr(ref, cand) for ref, cand in zip(colors[reference], colors[name])
+        ]))
+        print(f"[bench] {name:>9}: {report[name]['sec_per_frame']:7.2f} s/frame, "
+              f"mask IoU vs {reference}: {report[name]['mask_iou']:.4f}, "
+              f"RGB PSNR: {report[name]['rgb_psnr']:.1f} dB")
+
+    if output_path:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump({"reference": reference, "frames": num_frames, "presets": report}, f, indent=2)
+    return report
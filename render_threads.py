@@ -0,0 +1,104 @@
+# render_threads.py
+import os
+import resource
+import time
+import bpy
+import blenderproc as bproc
+
+
+def available_cpus():
+    """CPUs this process may run on (honours taskset, cgroup cpusets and batch schedulers)."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        return list(range(os.cpu_count() or 1))
+
+
+def configure_threads(num_threads: int = 0, workers: int = 1, worker_index: int = 0,
+                      pin_cpus: bool = False, tile_size: int = 0) -> int:
+    """
+    Give this Cycles instance its share of the machine.
+
+    num_threads=0 splits the available CPUs evenly over `workers` co-located processes, so
+    several workers on one box do not each spawn a thread per core and thrash. With pin_cpus
+    the process (all of its threads) is restricted to its own contiguous slice of CPUs.
+    tile_size > 0 sets a fixed Cycles tile size (0 keeps Blender's automatic tiling).
+    Returns the thread count used.
+    """
+    cpus = available_cpus()
+    workers = max(1, workers)
+    if num_threads <= 0:
+        num_threads = max(1, len(cpus) // workers)
+    bproc.renderer.set_cpu_threads(num_threads)
+
+    if pin_cpus:
+        start = (worker_index * num_threads) % len(cpus)
+        mine = {cpus[(start + i) % len(cpus)] for i in range(num_threads)}
+        _set_affinity_all_threads(mine)
+        print(f"[info] Worker {worker_index}: {num_threads} render threads pinned to CPUs {sorted(mine)}")
+    else:
+        print(f"[info] Worker {worker_index}: {num_threads} render threads ({len(cpus)} CPUs available)")
+
+    if tile_size > 0:
+        bpy.context.scene.cycles.use_auto_tile = True
+        bpy.context.scene.cycles.tile_size = tile_size
+    return num_threads
+
+
+def _set_affinity_all_threads(cpus):
+    # sched_setaffinity only affects one thread; Blender's thread pools already exist, so set every task
+    try:
+        tids = [int(t) for t in os.listdir("/proc/self/task")]
+    except OSError:
+        tids = [0]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            pass
+
+
+class CpuMonitor:
+    """
+    Reports wall time and achieved CPU utilization per rendered frame via Blender's
+    render_pre/render_post handlers. Utilization is process CPU time / wall time, shown
+    both in cores and as a share of the configured render threads. Set `enabled` to False
+    around renders that should not be counted (e.g. the segmentation pass).
+    """
+    def __init__(self, num_threads: int):
+        self.num_threads = max(1, num_threads)
+        self.enabled = True
+        self.frames = []
+        self._start = None
+
+    def install(self):
+        bpy.app.handlers.render_pre.append(self._pre)
+        bpy.app.handlers.render_post.append(self._post)
+        return self
+
+    def _cpu_time(self) -> float:
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return ru.ru_utime + ru.ru_stime
+
+    def _pre(self, scene, *_):
+        if not self.enabled:
+            return
+        self._start = (time.perf_counter(), self._cpu_time())
+
+    def _post(self, scene, *_):
+        if self._start is None:
+            return
+        wall = time.perf_counter() - self._start[0]
+        cores = (self._cpu_time() - self._start[1]) / wall if wall > 0 else 0.0
+        self._start = None
+        self.frames.append((wall, cores))
+        print(f"[cpu] frame {scene.frame_current}: {wall:.2f}s, {cores:.1f} cores busy "
+              f"({100.0 * cores / self.num_threads:.0f}% of {self.num_threads} threads)")
+
+    def summary(self) -> str:
+        if not self.frames:
+            return "no frames rendered"
+        wall = sum(w for w, _ in self.frames)
+        cores = sum(w * c for w, c in self.frames) / wall if wall > 0 else 0.0
+        return (f"{len(self.frames)} frames, {wall / len(self.frames):.2f}s/frame, "
+                f"{cores:.1f} cores busy on average ({100.0 * cores / self.num_threads:.0f}% of {self.num_threads} threads)")
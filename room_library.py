@@ -0,0 +1,90 @@
+# room_library.py
+import os
+import glob
+import random
+from collections import OrderedDict
+from typing import List
+import bpy
+import numpy as np
+import blenderproc as bproc
+
+# hidden prototypes are moved this far below their room so ray casts and collision checks never hit them
+_PARK_OFFSET = np.array([0.0, 0.0, -1000.0])
+
+
+class RoomLibrary:
+    """
+    Rooms built once with Scene.add_random_room and stored as library_dir/room_XXXX.blend.
+
+    Each file holds the shell (floor, walls, ceiling) plus the furniture the constructor
+    placed, with their meshes and material assignments. Rooms are saved unlit; the caller
+    relights a loaded room (Scene.use_room), so lighting still varies per scene while the
+    expensive construction (extrusions, corridor carving, furniture placement) is paid once.
+
+    A room file is appended only the first time it is picked; its objects stay loaded as
+    hidden prototypes (up to max_resident rooms, least recently used evicted first) and every
+    load() returns linked duplicates moved back into place, like FurniturePool. Ceilings get their own mesh copy
+    because light_room makes their materials emissive.
+    """
+    def __init__(self, library_dir, max_resident: int = 8):
+        self.library_dir = str(library_dir)
+        os.makedirs(self.library_dir, exist_ok=True)
+        self.max_resident = max_resident
+        self.prototypes: "OrderedDict[str, List[bproc.types.MeshObject]]" = OrderedDict()
+
+    def rooms(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.library_dir, "room_*.blend")))
+
+    def build(self, scene, count: int, **room_kwargs):
+        """Construct rooms with scene.add_random_room(**room_kwargs) until the library holds `count`."""
+        existing = len(self.rooms())
+        for i in range(existing, count):
+            room_objects = scene.add_random_room(light=False, **room_kwargs)
+            path = os.path.join(self.library_dir, f"room_{i:04d}.blend")
+            # absolute paths so the ccmaterial textures resolve from the library dir
+            bpy.data.libraries.write(path, {o.blender_obj for o in room_objects}, path_remap="ABSOLUTE", fake_user=True)
+            print(f"[info] Saved room {i + 1}/{count} ({len(room_objects)} objects) -> {path}")
+            scene.reset()
+
+    def load(self, path: str) -> List[bproc.types.MeshObject]:
+        instances = []
+        for proto in self._prototypes(path):
+            # light_surface swaps the material slots of the (shared) mesh, so ceilings must not share it
+            inst = proto.duplicate(duplicate_children=False, linked="Ceiling" not in proto.get_name())
+            inst.hide(False)
+            inst.set_location(np.asarray(proto.get_location()) - _PARK_OFFSET)
+            instances.append(inst)
+        self._evict(keep=path)
+        return instances
+
+    def load_random(self, rng=random) -> List[bproc.types.MeshObject]:
+        rooms = self.rooms()
+        if not rooms:
+            raise RuntimeError(f"Room library is empty: {self.library_dir}")
+        return self.load(rng.choice(rooms))
+
+    # -------- internals --------
+    def _prototypes(self, path: str) -> List[bproc.types.MeshObject]:
+        if path in self.prototypes:
+            self.prototypes.move_to_end(path)
+            return self.prototypes[path]
+        protos = [o for o in bproc.loader.load_blend(path, obj_types=["mesh"]) if isinstance(o, bproc.types.MeshObject)]
+        for proto in protos:
+            proto.hide(True)
+            proto.set_location(np.asarray(proto.get_location()) + _PARK_OFFSET)
+        self.prototypes[path] = protos
+        return protos
+
+    def _evict(self, keep: str):
+        for path in list(self.prototypes):
+            if len(self.prototypes) <= self.max_resident:
+                break
+            if path == keep:
+                continue
+            protos = self.prototypes.pop(path)
+            meshes = {o.blender_obj.data for o in protos}
+            bproc.object.delete_multiple(protos)
+            # the duplicates of the current room keep their meshes alive; the rest goes now
+            for mesh in meshes:
+                if mesh.users - int(mesh.use_fake_user) == 0:
+                    bpy.data.meshes.remove(mesh)
@@ -1,22 +1,85 @@
 import random
+import bpy
 import numpy as np
 import blenderproc as bproc
 import itertools
 from utility import sph_to_cart
+from camera_sampler import orbit_candidates, box_coverage, score_views, diverse_order
+from cc_materials import CCMaterialPool
+from furniture_pool import FurniturePool
 import os
 import glob
 import math
 
 class Scene:
-    def __init__(self, all_loaded_groups):
+    def __init__(self, all_loaded_groups, texture_cache=None):
+        self.lights = []
+        self.texture_cache = texture_cache  # optional TextureCache for backgrounds and room materials
+        self._cc_pools = {}                 # cc_material_dir -> CCMaterialPool, kept across scenes
+        self._furniture_pools = {}          # pix3d_dir -> FurniturePool, kept across scenes
+        self.set_groups(all_loaded_groups)
+
+    def set_groups(self, all_loaded_groups):
+        """Switch the trash objects used by this scene (e.g. a lazily loaded subset)."""
+        self.library_groups = all_loaded_groups
         self.all_loaded_groups = all_loaded_groups
+        # remember the pose each asset came in with, so reset() can restore it between scenes
+        self._initial_poses = [
+            (o, np.array(o.get_local2world_mat()))
+            for o in itertools.chain.from_iterable(all_loaded_groups)
+        ]
+
+    def reset(self):
+        """
+        Prepare for the next scene in the same Blender session: drop camera keyframes,
+        delete the room (shell + furniture) and lights, and restore asset poses/scales.
+        Loaded assets themselves stay resident.
+        """
+        bproc.utility.reset_keyframes()
+
+        leftovers = getattr(self, "room_objects", []) + getattr(self, "interior_objects", [])
+        # the constructor returns placed furniture as part of room_objects, so dedupe by name
+        alive = list({o.get_name(): o for o in leftovers if _is_alive(o)}.values())
+        if alive:
+            bproc.object.delete_multiple(alive)
+        self.room_objects = []
+        self.interior_objects = []
+
+        for light in self.lights:
+            if _is_alive(light):
+                light.delete()
+        self.lights = []
+
+        # sample_poses_on_surface hides objects it failed to place
+        for o, mat in self._initial_poses:
+            o.set_local2world_mat(mat)
+            o.hide(False)
+        self.all_loaded_groups = self.library_groups
+
+    def select_subset(self, k: int, sampler):
+        """
+        Keep only k groups of the library in this scene, chosen by sampler (a ClassBalancedSampler)
+        per category_id. The others stay loaded but are hidden from rendering.
+        """
+        by_class = {}
+        for g in self.library_groups:
+            by_class.setdefault(g[0].get_cp("category_id") if g[0].has_cp("category_id") else None, []).append(g)
+        chosen = sampler.pick(by_class, k)
+        chosen_ids = {id(g) for g in chosen}
+        for g in self.library_groups:
+            for o in g:
+                o.hide(id(g) not in chosen_ids)
+        self.all_loaded_groups = chosen
+        return chosen
 
     def sample_pose(self, obj: bproc.types.MeshObject):
         obj.set_location(np.random.uniform([-5, -5, -5], [5, 5, 5]))
         obj.set_rotation_euler(np.random.uniform([0, 0, 0], [np.pi, np.pi, np.pi]))
 
     def place_objects_randomly(self):
-        bproc.object.sample_poses(list(itertools.chain.from_iterable(self.all_loaded_groups)), sample_pose_func=self.sample_pose)
+        objs = list(itertools.chain.from_iterable(self.all_loaded_groups))
+        # hidden library objects must not block placement
+        bproc.object.sample_poses(objs, sample_pose_func=self.sample_pose, objects_to_check_collisions=objs)
 
     def find_camera_radius(self, distance_factor=1.5):
         mins, maxs = [], []
@@ -39,60 +102,120 @@ class Scene:
         base_radius = max(extent.max(), 1.0) * distance_factor # how far the camera sits
         return center, base_radius
     
-    def add_camera_poses(self, center, base_radius):
+    def add_camera_poses(self, center, base_radius, checker=None, max_tries: int = 25):
+        """
+        Register one camera pose on a sphere around center. With a visibility.ViewChecker,
+        poses are resampled until the checker accepts one (up to max_tries; the pose that
+        showed the most objects is used otherwise).
+        """
+        self._add_checked_pose(lambda: self._sample_orbit_pose(center, base_radius), checker, max_tries)
 
+    def add_camera_poses_batched(self, center, base_radius, num_views: int, num_candidates: int = 2000,
+                                 checker=None, min_box_fraction: float = 0.0005):
+        """
+        Register num_views poses around center chosen from num_candidates sampled at once:
+        candidates are scored by how many objects they show and how much of the image those
+        cover (projected bounding boxes), then picked greedily for score and spread of
+        viewing directions. With a checker, picked poses must also pass its occlusion test.
+        """
+        boxes = [np.asarray(o.get_bound_box()) for g in self.all_loaded_groups for o in g if not o.blender_obj.hide_render]
+        poses = orbit_candidates(center, base_radius, num_candidates)
+        if boxes:
+            render = bpy.context.scene.render
+            coverage = box_coverage(poses, np.stack(boxes), bproc.camera.get_intrinsics_as_K_matrix(),
+                                    (render.resolution_x, render.resolution_y))
+            scores = score_views(coverage, min_box_fraction)
+        else:
+            scores = np.zeros(len(poses))
+        order = diverse_order(poses, scores, center, num_views * 4 if checker is not None else num_views)
+
+        taken, rejected = [], []
+        for i in order:
+            if len(taken) == num_views:
+                break
+            if checker is not None and checker.count_visible(poses[i]) < checker.min_objects:
+                checker.rejected += 1
+                rejected.append(i)
+                continue
+            taken.append(i)
+        if len(taken) < num_views:
+            print(f"[warn] Only {len(taken)} of {num_views} candidate views passed the visibility check")
+            taken += rejected[:num_views - len(taken)]
+        for i in taken:
+            bproc.camera.add_camera_pose(poses[i])
+
+    def _sample_orbit_pose(self, center, base_radius):
         radius = base_radius * np.random.uniform(0.9, 1.2)
         az = np.random.uniform(0, 360)
         el = np.random.uniform(10, 45)
         cam_pos = center + sph_to_cart(radius, az, el)
 
         forward = center - cam_pos
-        cam_pose = bproc.math.build_transformation_mat(
+        return bproc.math.build_transformation_mat(
             cam_pos.tolist(),
             bproc.camera.rotation_from_forward_vec(forward.tolist(),
                                                 inplane_rot=np.random.uniform(0, 2*np.pi))
         )
-        bproc.camera.add_camera_pose(cam_pose)
-
-    def add_camera_in_room(self, min_height: float = 1.4, max_height: float = 1.7):
-            """
-            Place one camera somewhere inside the room (above the floor) and make it look at the room center.
-            """
-            if not hasattr(self, "room_objects"):
-                raise RuntimeError("No room objects found; call add_random_room() first.")
-
-            # Find a floor object
-            floor_objs = [o for o in self.room_objects if "Floor" in o.get_name()]
-            if not floor_objs:
-                raise RuntimeError("No floor object found in the room; cannot place camera.")
-            floor = floor_objs[0]
-
-            # Sample a camera location above the floor
-            cam_location = bproc.sampler.upper_region(
-                objects_to_sample_on=[floor],
-                min_height=min_height,
-                max_height=max_height,
-                use_ray_trace_check=True
-            )
 
-            # Aim at room center (from floor bbox)
-            bb = np.array(floor.get_bound_box())
-            room_center = bb.mean(axis=0)
-
-            forward_vec = room_center - cam_location
-            if np.linalg.norm(forward_vec) < 1e-6:
-                # Edge case: sampled exactly at center; point along -Z
-                forward_vec = np.array([0.0, 0.0, -1.0])
-
-            R = bproc.camera.rotation_from_forward_vec(forward_vec)  # 3x3
+    def add_camera_in_room(self, min_height: float = 1.4, max_height: float = 1.7, checker=None, max_tries: int = 25):
+        """
+        Place one camera somewhere inside the room (above the floor) and make it look at the room center.
+        checker/max_tries as in add_camera_poses.
+        """
+        if not getattr(self, "room_objects", None):
+            raise RuntimeError("No room objects found; call add_random_room() first.")
 
-            # Build a 4x4 cam2world matrix
-            cam2world = np.eye(4, dtype=np.float64)
-            cam2world[:3, :3] = R
-            cam2world[:3, 3]  = cam_location
+        # Find a floor object
+        floor_objs = [o for o in self.room_objects if "Floor" in o.get_name()]
+        if not floor_objs:
+            raise RuntimeError("No floor object found in the room; cannot place camera.")
+        self._add_checked_pose(lambda: self._sample_room_pose(floor_objs[0], min_height, max_height), checker, max_tries)
+
+    def _sample_room_pose(self, floor, min_height, max_height):
+        # Sample a camera location above the floor
+        cam_location = bproc.sampler.upper_region(
+            objects_to_sample_on=[floor],
+            min_height=min_height,
+            max_height=max_height,
+            use_ray_trace_check=True
+        )
 
-            # Register the pose
-            bproc.camera.add_camera_pose(cam2world)
+        # Aim at room center (from floor bbox)
+        bb = np.array(floor.get_bound_box())
+        room_center = bb.mean(axis=0)
+
+        forward_vec = room_center - cam_location
+        if np.linalg.norm(forward_vec) < 1e-6:
+            # Edge case: sampled exactly at center; point along -Z
+            forward_vec = np.array([0.0, 0.0, -1.0])
+
+        R = bproc.camera.rotation_from_forward_vec(forward_vec)  # 3x3
+
+        # Build a 4x4 cam2world matrix
+        cam2world = np.eye(4, dtype=np.float64)
+        cam2world[:3, :3] = R
+        cam2world[:3, 3]  = cam_location
+        return cam2world
+
+    def _add_checked_pose(self, sample, checker, max_tries):
+        # every pose rejected here saves rendering a frame without (visible) trash
+        cam2world = sample()
+        if checker is not None:
+            best, best_seen = cam2world, -1
+            for attempt in range(max_tries):
+                if attempt > 0:
+                    checker.rejected += 1
+                    cam2world = sample()
+                seen = checker.count_visible(cam2world)
+                if seen > best_seen:
+                    best, best_seen = cam2world, seen
+                if seen >= checker.min_objects:
+                    break
+            else:
+                print(f"[warn] No camera pose with {checker.min_objects} visible objects in {max_tries} tries, "
+                      f"using one with {best_seen}")
+            cam2world = best
+        bproc.camera.add_camera_pose(cam2world)
 
     def add_random_background(self, bg_folder, strength=1.0):
         """
@@ -107,14 +230,18 @@ class Scene:
             raise RuntimeError(f"No background images found in: {bg_folder}")
         chosen = random.choice(files)
 
-        bproc.world.set_world_background_hdr_img(chosen, strength=strength)
+        path = self.texture_cache.cached_file(chosen, "background") if self.texture_cache else chosen
+        bproc.world.set_world_background_hdr_img(path, strength=strength)
         
         return chosen
 
     def add_random_room(self, cc_material_dir, pix3d_dir, amount=50,
                         target_longest_side_range=(1.0, 1.1),
                         used_floor_area=9.0,
-                        wall_height=2.7):
+                        wall_height=2.7,
+                        num_materials=6,
+                        furniture_cache_dir=None,
+                        light=True):
         """
         Build a random room and populate it with a random subset of Pix3D meshes.
 
@@ -125,49 +252,27 @@ class Scene:
             target_longest_side_range: clamp each object's longest bbox side to this [min,max] (meters).
             used_floor_area: floor area in m² for the room.
             wall_height: room wall height in meters.
+            num_materials: how many random ccmaterials to load for floor/walls/ceiling
+                (already loaded ones are reused across rooms); None loads the whole folder.
+            furniture_cache_dir: where preprocessed Pix3D models are cached as .blend (None: memory only).
+            light: make the ceiling emissive (see light_room); off when building a RoomLibrary.
         """
 
-        materials = bproc.loader.load_ccmaterials(cc_material_dir)
-
-        # Find OBJ files under Pix3D
-        patterns = [
-            os.path.join(pix3d_dir, "*", "*.obj"),
-            os.path.join(pix3d_dir, "*", "*", "*.obj"),
-            os.path.join(pix3d_dir, "*", "*", "model.obj"),
-        ]
-        candidates = sorted({p for pat in patterns for p in glob.glob(pat)})
-        if not candidates:
-            raise RuntimeError(f"No OBJ files found under Pix3D dir: {pix3d_dir}")
-
-        chosen = random.sample(candidates, k=min(amount, len(candidates)))
-
-        def normalize_scale(mesh_obj, tgt_range):
-            """Scale so the longest bbox side is within tgt_range (meters)."""
-            bb = np.asarray(mesh_obj.get_bound_box())  # (8,3)
-            ext = bb.max(axis=0) - bb.min(axis=0)
-            longest = float(ext.max())
-            if longest <= 1e-6:
-                return  # skip degenerate
-            # Pick a random target size within range to add variation
-            target = random.uniform(*tgt_range)
-            s = target / longest
-            mesh_obj.set_scale([s, s, s])
-
-        interior_objects = []
-        for obj_path in chosen:
-            loaded = bproc.loader.load_obj(obj_path)
-            for o in loaded:
-                # Normalize to sensible furniture size instead of 100x
-                normalize_scale(o, target_longest_side_range)
-                
-                # fix the rotation bug fixed by object import
-                o.persist_transformation_into_mesh(location=False, rotation=True, scale=False)
-
-                # remove offset
-                o.move_origin_to_bottom_mean_point()
-
-                o.set_cp("dataset", "pix3d")
-            interior_objects.extend(loaded)
+        if num_materials:
+            key = str(cc_material_dir)
+            if key not in self._cc_pools:
+                self._cc_pools[key] = CCMaterialPool(cc_material_dir, texture_cache=self.texture_cache)
+            materials = self._cc_pools[key].sample(num_materials)
+        else:
+            if self.texture_cache:
+                cc_material_dir = self.texture_cache.mirror_dir(cc_material_dir, "room")
+            materials = bproc.loader.load_ccmaterials(cc_material_dir)
+
+        # Sample furniture from the session-wide pool (each Pix3D model is imported/normalized once)
+        key = str(pix3d_dir)
+        if key not in self._furniture_pools:
+            self._furniture_pools[key] = FurniturePool(pix3d_dir, cache_dir=furniture_cache_dir)
+        interior_objects = self._furniture_pools[key].sample(amount, target_longest_side_range)
 
         # Let the constructor build the room AND place interior_objects inside it
         room_objects = bproc.constructor.construct_random_room(
@@ -181,18 +286,38 @@ class Scene:
             amount_of_objects_per_sq_meter=1.0
         )
 
+        self.room_objects = room_objects  # these are shell objects, not furniture
+        self.interior_objects = interior_objects
+        if light:
+            self.light_room()
+        return room_objects
+
+    def resident_datablocks(self):
+        """Unused ccmaterials (and their images) the session-wide pools keep on purpose, see SceneGC.keep."""
+        for pool in self._cc_pools.values():
+            for mat in pool.loaded.values():
+                bpy_mat = mat.blender_obj
+                yield bpy_mat
+                if bpy_mat.use_nodes:
+                    yield from (n.image for n in bpy_mat.node_tree.nodes if getattr(n, "image", None) is not None)
+
+    def use_room(self, room_objects):
+        """Use an already built room (e.g. loaded from a RoomLibrary) and give it fresh lighting."""
+        self.room_objects = room_objects
+        self.interior_objects = []
+        self.light_room()
+        return room_objects
+
+    def light_room(self, emission_strength=(0.5, 1.0)):
         # Optional: make the ceiling softly emissive
         bproc.lighting.light_surface(
-            [o for o in room_objects if "Ceiling" in o.get_name()],
-            emission_strength=random.uniform(0.5, 1.0)
+            [o for o in self.room_objects if "Ceiling" in o.get_name()],
+            emission_strength=random.uniform(*emission_strength)
         )
-
-        self.room_objects = room_objects  # these are shell objects, not furniture
-        return room_objects
     
 
     def place_objects_in_room(self, scale: float = 0.08):
-        if not hasattr(self, "room_objects"):
+        if not getattr(self, "room_objects", None):
             raise RuntimeError("No room objects found; call add_random_room() first.")
         
         floor_objs = [o for o in self.room_objects if "Floor" in o.get_name()]
@@ -232,4 +357,15 @@ class Scene:
         light = bproc.types.Light()
         light.set_type(light_type)
         light.set_location(location)
-        light.set_energy(energy)
\ No newline at end of file
+        light.set_energy(energy)
+        self.lights.append(light)
+        return light
+
+
+def _is_alive(obj) -> bool:
+    """False if the wrapped Blender object was already removed (e.g. by the room constructor)."""
+    try:
+        obj.blender_obj.name
+        return True
+    except ReferenceError:
+        return False
\ No newline at end of file
@@ -0,0 +1,83 @@
+# scene_gc.py
+import os
+import resource
+import bpy
+from typing import Callable, Dict, Iterable, List
+
+# exit code of a worker that stopped early to be restarted with a fresh process (see scripts/launch_shards.py)
+RESTART_EXIT_CODE = 75
+PROGRESS_FILE = "progress.json"
+
+# bpy.data collections that per-scene work adds to
+TRACKED = ("objects", "meshes", "materials", "images", "textures", "lattices", "node_groups", "lights", "curves")
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def datablock_counts() -> Dict[str, int]:
+    return {name: len(getattr(bpy.data, name)) for name in TRACKED}
+
+
+class SceneGC:
+    """
+    Frees the datablocks a scene left behind and watches the memory of the worker.
+
+    begin_scene() remembers which datablocks exist; collect() (after Scene.reset() and
+    clear_weathering) removes those created since then that have no users left: weathering
+    textures and lattices, meshes and materials of deleted rooms and furniture, images of
+    unused ccmaterials, dust node groups of removed materials. Removal repeats until nothing
+    new becomes orphaned. Datablocks with a fake user and those returned by the keep()
+    providers (session-wide pools that hold unused datablocks on purpose) are never removed.
+
+    After each collect the RSS and datablock counts are printed; over_limit() tells whether
+    the RSS is above max_rss_mb, in which case the caller should exit with RESTART_EXIT_CODE.
+    """
+    def __init__(self, max_rss_mb: float = 0):
+        self.max_rss_mb = max_rss_mb
+        self._keep: List[Callable[[], Iterable]] = []
+        self._baseline: Dict[str, set] = {}
+        self.last_rss_mb = rss_mb()
+
+    def keep(self, provider: Callable[[], Iterable]):
+        """Register a callable returning datablocks that must survive collect()."""
+        self._keep.append(provider)
+
+    def begin_scene(self):
+        self._baseline = {name: {b.as_pointer() for b in getattr(bpy.data, name)} for name in TRACKED}
+
+    def collect(self, label: str = "") -> Dict[str, int]:
+        kept = {b.as_pointer() for provider in self._keep for b in provider() if b is not None}
+        freed: Dict[str, int] = {}
+        while True:
+            removed = 0
+            for name in TRACKED:
+                coll = getattr(bpy.data, name)
+                baseline = self._baseline.get(name, set())
+                orphans = [b for b in coll if b.users == 0 and not b.use_fake_user
+                           and b.as_pointer() not in baseline and b.as_pointer() not in kept
+                           # Render Result / Viewer Node images belong to the renderer
+                           and not (name == "images" and b.type != "IMAGE")]
+                for b in orphans:
+                    coll.remove(b)
+                if orphans:
+                    freed[name] = freed.get(name, 0) + len(orphans)
+                    removed += len(orphans)
+            if removed == 0:
+                break
+
+        self.last_rss_mb = rss_mb()
+        counts = datablock_counts()
+        freed_str = ", ".join(f"{n} {k}" for k, n in freed.items()) or "nothing"
+        print(f"[info] {label + ': ' if label else ''}freed {freed_str}; RSS {self.last_rss_mb:.0f} MB; "
+              + " ".join(f"{k}={n}" for k, n in counts.items()))
+        return freed
+
+    def over_limit(self) -> bool:
+        return self.max_rss_mb > 0 and self.last_rss_mb > self.max_rss_mb
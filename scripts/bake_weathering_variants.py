@@ -0,0 +1,59 @@
+import blenderproc as bproc
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_loader import AssetLoader, free_groups
+from weathering_variants import WeatheringVariants
+
+
+def cli():
+    """
+    Bake weathered shape variants of every asset of configs/class_mapping.json.
+
+    Run once after changing assets:
+        blenderproc run scripts/bake_weathering_variants.py cache/weathering --num_variants 8
+    then pass --apply_weathering --weathering_variants_dir cache/weathering to trash_proc.py.
+    """
+    parser = argparse.ArgumentParser("Bakes per-asset weathering variants")
+    parser.add_argument('variants_dir', help="Where the variant .npz/.json files are written.")
+    parser.add_argument('--num_variants', type=int, default=8, help="Deformed variants per asset.")
+    parser.add_argument('--asset_cache_dir', default=None, help="Import assets from this .blend cache (see build_asset_cache.py).")
+    parser.add_argument('--backend', choices=["modifiers", "numpy"], default="numpy", help="Weathering backend used to deform the assets.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible variants.")
+    parser.add_argument('--force', action='store_true', help="Rebake even if the variants are up to date.")
+    args = parser.parse_args()
+
+    bproc.init()
+    if args.seed is not None:
+        random.seed(args.seed)
+    loader = AssetLoader(cache_dir=args.asset_cache_dir)
+    variants = WeatheringVariants(args.variants_dir)
+
+    with open(ROOT / "configs/class_mapping.json", "r") as f:
+        class_mappings = json.load(f)
+
+    for category in class_mappings:
+        category_dir = os.path.join(ROOT, "assets", category["class_dir"])
+        if not os.path.exists(category_dir):
+            print(f"[warn] Category directory does not exist: {category_dir}")
+            continue
+        if not args.force and variants.is_valid(category_dir, args.num_variants):
+            print(f"[info] Variants up to date: {category['class_name']}")
+            continue
+        groups = loader.load_assets(asset_dir=category_dir, category_id=category["class_id"],
+                                    category_name=category["class_name"], clear=True)
+        variants.bake(category_dir, [g[0] for g in groups], args.num_variants, backend=args.backend)
+        free_groups(groups)
+
+    print(f"Done baking weathering variants in {args.variants_dir}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,50 @@
+import blenderproc as bproc
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_loader import AssetLoader
+
+
+def cli():
+    """
+    Pre-bake every category of configs/class_mapping.json into the asset cache.
+
+    Run once after changing assets:
+        blenderproc run scripts/build_asset_cache.py cache/assets
+    then pass --asset_cache_dir cache/assets to trash_proc.py.
+    """
+    parser = argparse.ArgumentParser("Builds the per-category .blend asset cache")
+    parser.add_argument('cache_dir', help="Where the cached .blend files are written.")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the cache is up to date.")
+    args = parser.parse_args()
+
+    bproc.init()
+    loader = AssetLoader(cache_dir=args.cache_dir)
+
+    with open(ROOT / "configs/class_mapping.json", "r") as f:
+        class_mappings = json.load(f)
+
+    for category in class_mappings:
+        category_dir = os.path.join(ROOT, "assets", category["class_dir"])
+        if not os.path.exists(category_dir):
+            print(f"[warn] Category directory does not exist: {category_dir}")
+            continue
+        if args.force and os.path.exists(loader.cache.meta_path(category_dir)):
+            os.remove(loader.cache.meta_path(category_dir))
+        if loader.cache.is_valid(category_dir, category["class_id"], category["class_name"]):
+            print(f"[info] Cache up to date: {category['class_name']}")
+            continue
+        loader.load_assets(asset_dir=category_dir, category_id=category["class_id"],
+                           category_name=category["class_name"], clear=True)
+
+    print(f"Done building asset cache in {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,43 @@
+import blenderproc as bproc
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_loader import AssetLoader
+from asset_manifest import AssetManifest
+
+
+def cli():
+    """
+    Index every asset of configs/class_mapping.json into a manifest (used by --assets_per_scene).
+
+        blenderproc run scripts/build_asset_manifest.py
+
+    Incremental: files whose size and mtime did not change keep their previous entry.
+    """
+    parser = argparse.ArgumentParser("Builds the asset manifest")
+    parser.add_argument('--asset_root', default=str(ROOT / "assets"), help="Folder containing the class_dir subfolders.")
+    parser.add_argument('--output', default=None, help="Manifest path (default: <asset_root>/manifest.json).")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.asset_root, "manifest.json")
+    bproc.init()
+
+    with open(ROOT / "configs/class_mapping.json", "r") as f:
+        class_mappings = json.load(f)
+
+    manifest = AssetManifest.load(output, asset_root=args.asset_root) if os.path.exists(output) \
+        else AssetManifest(args.asset_root)
+    manifest.build(class_mappings, AssetLoader())
+    manifest.save(output)
+
+    print(f"Done indexing {len(manifest.entries)} assets into {output}")
+
+
+if __name__ == "__main__":
+    cli()
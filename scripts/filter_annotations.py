@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Drop small annotations from an existing COCO file and report per-category statistics.
+
+Area and bbox of RLE annotations are recomputed from the run lengths (no mask decoding),
+so the threshold is applied to the actual visible pixels even for older outputs.
+
+    python scripts/filter_annotations.py output/coco_data/coco_annotations.json --min_visible_pixels 100
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mask_stats import rle_area_bbox
+
+
+def cli():
+    parser = argparse.ArgumentParser("Filters COCO annotations by visible pixels")
+    parser.add_argument("coco", help="coco_annotations.json to read.")
+    parser.add_argument("--min_visible_pixels", type=int, default=1, help="Drop annotations with fewer pixels.")
+    parser.add_argument("--max_occlusion", type=float, default=None, help="Drop annotations whose 'occlusion' is above this (written with --occlusion_stats).")
+    parser.add_argument("--output", default=None, help="Where to write the result (default: <coco>_filtered.json).")
+    args = parser.parse_args()
+
+    with open(args.coco, "r", encoding="utf-8") as f:
+        coco = json.load(f)
+
+    kept, dropped = [], Counter()
+    for ann in coco["annotations"]:
+        seg = ann.get("segmentation")
+        if isinstance(seg, dict) and "counts" in seg and isinstance(seg["counts"], list):
+            ann["area"], ann["bbox"] = rle_area_bbox(seg)
+        if ann["area"] < args.min_visible_pixels:
+            dropped[ann["category_id"]] += 1
+        elif args.max_occlusion is not None and ann.get("occlusion", 0.0) > args.max_occlusion:
+            dropped[ann["category_id"]] += 1
+        else:
+            kept.append(ann)
+    coco["annotations"] = kept
+
+    output = args.output or os.path.splitext(args.coco)[0] + "_filtered.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(coco, f)
+
+    counts = Counter(a["category_id"] for a in kept)
+    for cat in sorted(set(counts) | set(dropped)):
+        print(f"category {cat}: kept {counts[cat]}, dropped {dropped[cat]}")
+    print(f"Wrote {len(kept)} annotations ({sum(dropped.values())} dropped) to {output}")
+
+
+if __name__ == "__main__":
+    cli()
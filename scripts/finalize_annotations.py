@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Write coco_annotations.json from the annotations.jsonl of an output dir.
+
+trash_proc.py --annotation_format jsonl does this at exit; use this script for runs that
+were killed before finishing, or to look at a dataset while it is still being generated:
+
+    python scripts/finalize_annotations.py output/coco_data
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from annotation_sink import COCO_FILE, JSONL_FILE, finalize_jsonl
+
+
+def cli():
+    parser = argparse.ArgumentParser("Finalizes annotations.jsonl into COCO JSON")
+    parser.add_argument("output_dir", help="Directory containing annotations.jsonl.")
+    parser.add_argument("--output", default=None, help=f"COCO file to write (default: <output_dir>/{COCO_FILE}).")
+    args = parser.parse_args()
+
+    jsonl_path = os.path.join(args.output_dir, JSONL_FILE)
+    if not os.path.exists(jsonl_path):
+        sys.exit(f"No {JSONL_FILE} in {args.output_dir}")
+    finalize_jsonl(jsonl_path, args.output or os.path.join(args.output_dir, COCO_FILE))
+
+
+if __name__ == "__main__":
+    cli()
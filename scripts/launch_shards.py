@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Run trash_proc.py as K parallel BlenderProc workers and merge their output.
+
+Each worker (shard) gets its own output subdirectory, a disjoint range of global scene
+indices (scene seeds derive from --seed and the index, see seeding.py) and a CPU thread budget, so shards never clobber each other's coco_annotations.json.
+After all workers finish, the per-shard COCO files are merged into one file with
+re-numbered image/annotation ids whose file_name entries point into the shard dirs
+(with --annotation_format tar, the shard tar indexes are combined instead).
+
+Usage:
+    python scripts/launch_shards.py --workers 4 --num_scenes 100 --out output/run1 -- --random_background --num_views 10
+
+Everything after "--" is forwarded to trash_proc.py unchanged.
+
+A worker that stops because it reached --max_rss_mb (exit code 75, see scene_gc.py) is
+restarted for its remaining scenes, appending to the same shard directory.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from annotation_sink import COCO_FILE, JSONL_FILE, finalize_jsonl
+from tar_shards import INDEX_FILE
+
+# scene_gc.py imports bpy, so its constants are repeated here
+RESTART_EXIT_CODE = 75
+PROGRESS_FILE = "progress.json"
+SCENES_FILE = "scenes.jsonl"  # seeding.py
+TAR_DIR = "shards"  # trash_proc.py --annotation_format tar
+POLL_SECONDS = 1.0
+
+
+def log(msg):
+    print(f"[info] {msg}")
+
+
+def warn(msg):
+    print(f"[warn] {msg}")
+
+
+def shard_dir(out_root: Path, shard_index: int) -> Path:
+    return out_root / f"shard_{shard_index:03d}"
+
+
+def split_scenes(num_scenes: int, workers: int):
+    """Distribute num_scenes over workers as evenly as possible; returns (first_scene, count) per shard."""
+    base, extra = divmod(num_scenes, workers)
+    ranges, start = [], 0
+    for i in range(workers):
+        count = base + (1 if i < extra else 0)
+        ranges.append((start, count))
+        start += count
+    return ranges
+
+
+def worker_command(blenderproc: str, shard_out: Path, seed: int, first_scene: int, num_scenes: int, threads: int,
+                   workers: int, worker_index: int, pin_cpus: bool, extra_args):
+    cmd = [
+        blenderproc, "run", str(ROOT / "trash_proc.py"),
+        "--output_dir", str(shard_out),
+        "--seed", str(seed),
+        "--first_scene", str(first_scene),
+        "--num_scenes", str(num_scenes),
+        "--num_threads", str(threads),
+        "--workers_per_machine", str(workers),
+        "--worker_index", str(worker_index),
+    ]
+    if pin_cpus:
+        cmd.append("--pin_cpus")
+    return cmd + list(extra_args)
+
+
+def launch(args, extra_args):
+    out_root = Path(args.out).resolve()  # workers run with cwd=ROOT
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    # 0 lets each worker split the CPUs it is allowed to use (see render_threads.configure_threads)
+    threads = args.threads_per_worker
+    log(f"{args.workers} workers, {threads or 'auto'} threads each on {os.cpu_count()} cores")
+
+    def start(shard_index, first_scene, count, mode="w"):
+        shard_out = shard_dir(out_root, shard_index)
+        # scene i of the whole run always gets the seeds of index i, independent of the worker count
+        cmd = worker_command(args.blenderproc, shard_out, args.seed, first_scene, count, threads,
+                             args.workers, shard_index, args.pin_cpus, extra_args)
+        log_file = open(shard_out / "worker.log", mode)
+        return subprocess.Popen(cmd, cwd=ROOT, stdout=log_file, stderr=subprocess.STDOUT), log_file
+
+    procs = []
+    for shard_index, (first_scene, count) in enumerate(split_scenes(args.num_scenes, args.workers)):
+        if count == 0:
+            continue
+        shard_out = shard_dir(out_root, shard_index)
+        shard_out.mkdir(parents=True, exist_ok=True)
+        log(f"shard {shard_index}: scenes {first_scene}..{first_scene + count - 1} -> {shard_out}")
+        procs.append((shard_index, first_scene, count, *start(shard_index, first_scene, count)))
+
+    # poll all workers, so one that stops at its memory limit is restarted right away
+    running = {shard_index: (first_scene, count, proc, log_file, 0)
+               for shard_index, first_scene, count, proc, log_file in procs}
+    failed = []
+    t0 = time.time()
+    while running:
+        for shard_index in list(running):
+            first_scene, count, proc, log_file, restarts = running[shard_index]
+            ret = proc.poll()
+            if ret is None:
+                continue
+            log_file.close()
+            if ret == RESTART_EXIT_CODE and restarts < args.max_restarts:
+                progress_path = shard_dir(out_root, shard_index) / PROGRESS_FILE
+                with open(progress_path, "r") as f:
+                    done = json.load(f)["scenes_done"]
+                progress_path.unlink()
+                first_scene, count = first_scene + done, count - done
+                restarts += 1
+                log(f"shard {shard_index}: restart {restarts} at its memory limit, scenes {first_scene}..{first_scene + count - 1} left")
+                running[shard_index] = (first_scene, count, *start(shard_index, first_scene, count, mode="a"), restarts)
+                continue
+            del running[shard_index]
+            if ret != 0:
+                warn(f"shard {shard_index} exited with code {ret}, see {shard_dir(out_root, shard_index) / 'worker.log'}")
+                failed.append(shard_index)
+        if running:
+            time.sleep(POLL_SECONDS)
+    log(f"All workers finished in {time.time() - t0:.1f}s ({len(failed)} failed)")
+    return sorted(failed)
+
+
+def merge_categories(merged, categories, source):
+    """Add categories to merged (a list), matching them by id; the same id must keep its name."""
+    known = {c["id"]: c for c in merged}
+    for cat in categories:
+        prev = known.get(cat["id"])
+        if prev is None:
+            merged.append(cat)
+            known[cat["id"]] = cat
+        elif prev.get("name") != cat.get("name"):
+            raise ValueError(f"Category id {cat['id']} is '{prev.get('name')}' in earlier shards "
+                             f"but '{cat.get('name')}' in {source}")
+    merged.sort(key=lambda c: c["id"])
+
+
+def merge_coco(out_root: Path, shard_dirs=None):
+    """
+    Merge <shard>/coco_annotations.json files into <out_root>/coco_annotations.json.
+    Image and annotation ids are re-numbered consecutively; file_name is made relative to out_root
+    and categories are united by id (a ValueError is raised if shards name an id differently).
+    Shards written with --annotation_format jsonl that were not finalized (crashed worker)
+    are finalized from their annotations.jsonl first. The per-scene seed records (scenes.jsonl)
+    are merged as well, with image ids mapped to the merged ones. Returns None if no shard
+    has COCO annotations (e.g. --annotation_format tar, see merge_tar_index).
+    """
+    out_root = Path(out_root)
+    if shard_dirs is None:
+        shard_dirs = sorted(p for p in out_root.glob("shard_*") if (p / COCO_FILE).exists() or (p / JSONL_FILE).exists())
+
+    merged = None
+    next_image_id, next_ann_id = 0, 0
+    scene_records = []
+    for sd in shard_dirs:
+        coco_path, jsonl_path = Path(sd) / COCO_FILE, Path(sd) / JSONL_FILE
+        if jsonl_path.exists() and (not coco_path.exists() or coco_path.stat().st_mtime < jsonl_path.stat().st_mtime):
+            finalize_jsonl(str(jsonl_path), str(coco_path))
+        if not coco_path.exists():
+            warn(f"No {COCO_FILE} in {sd}, skipping")
+            continue
+        with open(coco_path, "r") as f:
+            coco = json.load(f)
+
+        if merged is None:
+            merged = {k: v for k, v in coco.items() if k not in ("images", "annotations", "categories")}
+            merged["images"], merged["annotations"], merged["categories"] = [], [], []
+        # shards only list the categories of the objects they loaded
+        merge_categories(merged["categories"], coco.get("categories", []), coco_path)
+
+        rel = os.path.relpath(sd, out_root)
+        image_id_map = {}
+        for img in coco.get("images", []):
+            image_id_map[img["id"]] = next_image_id
+            merged["images"].append({**img, "id": next_image_id, "file_name": f"{rel}/{img['file_name']}"})
+            next_image_id += 1
+        for ann in coco.get("annotations", []):
+            merged["annotations"].append({**ann, "id": next_ann_id, "image_id": image_id_map[ann["image_id"]]})
+            next_ann_id += 1
+        scenes_path = Path(sd) / SCENES_FILE
+        if scenes_path.exists():
+            with open(scenes_path, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    record = json.loads(line)
+                    record["shard"] = rel
+                    record["image_ids"] = [image_id_map[i] for i in record["image_ids"] if i in image_id_map]
+                    scene_records.append(record)
+
+    if merged is None:
+        return None
+
+    out_path = out_root / COCO_FILE
+    with open(out_path, "w") as f:
+        json.dump(merged, f)
+    if scene_records:
+        with open(out_root / SCENES_FILE, "w") as f:
+            for record in sorted(scene_records, key=lambda r: r["scene"]):
+                f.write(json.dumps(record) + "\n")
+    log(f"Merged {len(merged['images'])} images / {len(merged['annotations'])} annotations -> {out_path}")
+    return out_path
+
+
+def merge_tar_index(out_root: Path, shard_dirs=None):
+    """
+    Combine the tar shard indexes (<shard>/shards/index.json) into <out_root>/index.json.
+    Tar files are listed with paths relative to out_root; their samples keep the image ids of
+    their worker, which restart at 0 in every worker, so each shard entry also gets an
+    image_id_offset that makes offset + id unique across the run. Returns None if no shard
+    wrote tar output.
+    """
+    out_root = Path(out_root)
+    if shard_dirs is None:
+        shard_dirs = sorted(p for p in out_root.glob("shard_*") if (p / TAR_DIR / INDEX_FILE).exists())
+
+    merged = None
+    offset = 0
+    scene_records = []
+    for sd in shard_dirs:
+        index_path = Path(sd) / TAR_DIR / INDEX_FILE
+        if not index_path.exists():
+            warn(f"No {TAR_DIR}/{INDEX_FILE} in {sd}, skipping")
+            continue
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        if merged is None:
+            merged = {"shards": [], "categories": []}
+        merge_categories(merged["categories"], index.get("categories", []), index_path)
+
+        rel = os.path.relpath(sd, out_root)
+        for shard in index["shards"]:
+            merged["shards"].append({**shard, "name": f"{rel}/{TAR_DIR}/{shard['name']}",
+                                     "worker": rel, "image_id_offset": offset})
+        if index["shards"]:
+            worker_offset = offset
+            offset += index["shards"][-1]["last_image_id"] + 1
+            scenes_path = Path(sd) / SCENES_FILE
+            if scenes_path.exists():
+                with open(scenes_path, "r") as f:
+                    for line in f:
+                        if not line.endswith("\n"):
+                            break
+                        record = json.loads(line)
+                        record["shard"] = rel
+                        record["image_ids"] = [worker_offset + i for i in record["image_ids"] if i < offset - worker_offset]
+                        scene_records.append(record)
+
+    if merged is None:
+        return None
+
+    out_path = out_root / INDEX_FILE
+    with open(out_path, "w") as f:
+        json.dump(merged, f, indent=2)
+    if scene_records:
+        with open(out_root / SCENES_FILE, "w") as f:
+            for record in sorted(scene_records, key=lambda r: r["scene"]):
+                f.write(json.dumps(record) + "\n")
+    log(f"Indexed {len(merged['shards'])} tar shards / {sum(s['num_samples'] for s in merged['shards'])} samples -> {out_path}")
+    return out_path
+
+
+def main():
+    raw = sys.argv[1:]
+    extra_args = []
+    if "--" in raw:
+        raw, extra_args = raw[: raw.index("--")], raw[raw.index("--") + 1 :]
+
+    ap = argparse.ArgumentParser(description="Parallel sharded dataset generation")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 8), help="number of BlenderProc worker processes")
+    ap.add_argument("--num_scenes", type=int, default=1, help="total scenes across all workers")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the run (every scene derives its seeds from it and its index)")
+    ap.add_argument("--threads_per_worker", type=int, default=0, help="render threads per worker (0 = cores / workers)")
+    ap.add_argument("--pin_cpus", action="store_true", help="pin every worker to its own slice of CPUs")
+    ap.add_argument("--out", default="output/shards", help="root directory for shard subdirectories and the merged COCO file")
+    ap.add_argument("--blenderproc", default="blenderproc", help="blenderproc executable")
+    ap.add_argument("--max_restarts", type=int, default=20, help="restarts per worker after it stopped at --max_rss_mb")
+    ap.add_argument("--merge_only", action="store_true", help="skip rendering and only merge existing shards")
+    args = ap.parse_args(raw)
+
+    if not args.merge_only:
+        failed = launch(args, extra_args)
+        if failed:
+            warn(f"Shards {failed} failed; merging whatever they wrote")
+    out_root = Path(args.out)
+    if merge_coco(out_root) is None:
+        log(f"No {COCO_FILE} in the shards, skipping the COCO merge")
+        if merge_tar_index(out_root) is None:
+            raise RuntimeError(f"No shard annotations found under {out_root}")
+
+
+if __name__ == "__main__":
+    main()
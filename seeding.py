@@ -0,0 +1,41 @@
+# seeding.py
+"""
+Per-scene, per-stage seeds.
+
+Every stage of a scene (asset choice, weathering, room/background, object placement,
+cameras, rendering) gets its own seed derived from the run seed and the global scene
+index only. The stage reseeds the global `random` and `np.random` (which BlenderProc
+uses internally) right before it runs, so a stage draws the same values no matter how
+many draws earlier stages or earlier scenes made. Each scene's seeds are appended to
+<output_dir>/scenes.jsonl together with the image ids it produced.
+"""
+import os
+import json
+import random
+import zlib
+from typing import Dict
+import numpy as np
+
+SCENES_FILE = "scenes.jsonl"
+STAGES = ("assets", "weathering", "layout", "placement", "cameras", "render")
+
+
+def stage_seed(base_seed: int, scene_index: int, stage: str) -> int:
+    # the stage is keyed by name (not position), so adding a stage does not shift the others
+    base_seed %= 2**64
+    entropy = [base_seed & 0xFFFFFFFF, base_seed >> 32, scene_index, zlib.crc32(stage.encode())]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def scene_seeds(base_seed: int, scene_index: int) -> Dict[str, int]:
+    return {stage: stage_seed(base_seed, scene_index, stage) for stage in STAGES}
+
+
+def seed_stage(seeds: Dict[str, int], stage: str):
+    random.seed(seeds[stage])
+    np.random.seed(seeds[stage])
+
+
+def append_scene_record(output_dir: str, record: dict):
+    with open(os.path.join(str(output_dir), SCENES_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
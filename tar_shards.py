@@ -0,0 +1,108 @@
+# tar_shards.py
+import io
+import os
+import json
+import tarfile
+import time
+from typing import List, Optional
+
+INDEX_FILE = "index.json"
+
+
+class TarShardSink:
+    """
+    Writes samples into fixed-size tar shards (WebDataset layout): per image
+    <key>.jpg, <key>.json (image info, categories, annotations) and optionally
+    <key>.mask.png (16 bit instance segmap, ids listed in the json as mask_instance_ids).
+
+    <shard_dir>/index.json lists every finished shard with its sample count, image id range
+    and size, plus the categories seen so far. It is rewritten whenever a shard is closed,
+    so a shard that was still open when a run died is not in the index and is overwritten
+    on the next run, which continues with the ids after the indexed ones.
+    """
+    stores_images = True
+
+    def __init__(self, shard_dir: str, shard_size: int = 1000, store_masks: bool = False):
+        self.shard_dir = str(shard_dir)
+        self.shard_size = max(1, shard_size)
+        self.store_masks = store_masks
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.index_path = os.path.join(self.shard_dir, INDEX_FILE)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {"shards": [], "categories": []}
+        last = self.index["shards"][-1] if self.index["shards"] else None
+        self.next_image_id = last["last_image_id"] + 1 if last else 0
+        self.next_annotation_id = last["last_annotation_id"] + 1 if last else 1
+        self._tar: Optional[tarfile.TarFile] = None
+        self._current = None
+
+    @staticmethod
+    def key(image_id: int) -> str:
+        return f"{image_id:09d}"
+
+    def file_name(self, image_id: int) -> str:
+        return f"{self.key(image_id)}.jpg"
+
+    def append(self, image: dict, categories: List[dict], annotations: List[dict], payload: dict):
+        for ann in annotations:
+            ann["id"] = self.next_annotation_id
+            self.next_annotation_id += 1
+        self.next_image_id = max(self.next_image_id, image["id"] + 1)
+        for cat in categories:
+            if cat not in self.index["categories"]:
+                self.index["categories"].append(cat)
+
+        if self._tar is None:
+            self._open_shard(image["id"])
+        key = self.key(image["id"])
+        sample = {"image": image, "categories": categories, "annotations": annotations}
+        if self.store_masks:
+            sample["mask_instance_ids"] = payload["mask_instance_ids"]
+        self._add(f"{key}.jpg", payload["jpg"])
+        self._add(f"{key}.json", json.dumps(sample).encode("utf-8"))
+        if self.store_masks:
+            self._add(f"{key}.mask.png", payload["mask.png"])
+
+        self._current["num_samples"] += 1
+        self._current["last_image_id"] = image["id"]
+        self._current["last_annotation_id"] = self.next_annotation_id - 1
+        if self._current["num_samples"] >= self.shard_size:
+            self._close_shard()
+
+    def flush(self):
+        if self._tar is not None:
+            self._tar.fileobj.flush()
+
+    def close(self):
+        self._close_shard()
+
+    # -------- internals --------
+    def _open_shard(self, first_image_id: int):
+        name = f"shard-{len(self.index['shards']):06d}.tar"
+        self._tar = tarfile.open(os.path.join(self.shard_dir, name), "w")
+        self._current = {"name": name, "num_samples": 0, "first_image_id": first_image_id,
+                         "last_image_id": first_image_id, "last_annotation_id": self.next_annotation_id - 1}
+
+    def _add(self, name: str, data: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def _close_shard(self):
+        if self._tar is None:
+            return
+        self._tar.close()
+        self._tar = None
+        self._current["bytes"] = os.path.getsize(os.path.join(self.shard_dir, self._current["name"]))
+        self.index["shards"].append(self._current)
+        self._current = None
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_path)
+        shard = self.index["shards"][-1]
+        print(f"[info] Wrote {shard['name']} ({shard['num_samples']} samples, {shard['bytes'] / 2**20:.1f} MB)")
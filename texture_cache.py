@@ -0,0 +1,108 @@
+# texture_cache.py
+import os
+import shutil
+import hashlib
+import bpy
+from typing import Dict, Optional
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".hdr", ".exr", ".tga", ".bmp", ".tif", ".tiff")
+
+# file_format per extension when writing a downscaled copy; rarely used/slow-to-decode formats become PNG
+_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".hdr": "HDR", ".exr": "OPEN_EXR"}
+
+
+class TextureCache:
+    """
+    Resolution-capped copies of textures, written once into cache_dir.
+
+    Each use ("background", "room", "object") has its own max size (longest side in px).
+    Single files are keyed by a hash of source path, size, mtime and the max size;
+    whole folders (ccmaterials) are mirrored with their file names kept, because
+    bproc.loader.load_ccmaterials finds maps by name. Images already small enough are
+    symlinked instead of re-encoded. Requires Blender (uses bpy to scale/save).
+    """
+    DEFAULT_MAX_SIZE = {"background": 2048, "room": 1024, "object": 1024}
+
+    def __init__(self, cache_dir: str, max_size: Optional[Dict[str, int]] = None):
+        self.cache_dir = str(cache_dir)
+        self.max_size = {**self.DEFAULT_MAX_SIZE, **(max_size or {})}
+
+    # -------- single files --------
+    def cached_file(self, src: str, use: str) -> str:
+        """Path of a capped copy of src for the given use (created on first request)."""
+        src = os.path.abspath(str(src))
+        max_size = self.max_size[use]
+        st = os.stat(src)
+        key = hashlib.sha1(f"{src}|{st.st_size}|{st.st_mtime_ns}|{max_size}".encode()).hexdigest()[:16]
+        stem, ext = os.path.splitext(os.path.basename(src))
+        ext = ext.lower() if ext.lower() in _FORMATS else ".png"
+        dst = os.path.join(self.cache_dir, use, f"{stem}_{key}{ext}")
+        if not os.path.exists(dst):
+            self._write_capped(src, dst, max_size)
+        return dst
+
+    # -------- folders --------
+    def mirror_dir(self, src_dir: str, use: str, subdirs=None) -> str:
+        """
+        Mirror the images of src_dir/<subdir>/ (all subdirs by default) into the cache, keeping
+        file names. Returns the mirror root, usable in place of src_dir. Stale files (older than
+        their source) are re-created.
+        """
+        src_dir = os.path.abspath(str(src_dir))
+        max_size = self.max_size[use]
+        key = hashlib.sha1(f"{src_dir}|{max_size}".encode()).hexdigest()[:16]
+        root = os.path.join(self.cache_dir, use, f"{os.path.basename(src_dir)}_{key}")
+        if subdirs is None:
+            subdirs = [d for d in os.listdir(src_dir) if os.path.isdir(os.path.join(src_dir, d))]
+        for sub in subdirs:
+            for f in os.listdir(os.path.join(src_dir, sub)):
+                if not f.lower().endswith(IMAGE_EXTS):
+                    continue
+                src = os.path.join(src_dir, sub, f)
+                dst = os.path.join(root, sub, f)
+                if not os.path.exists(dst) or os.path.getmtime(dst) < os.path.getmtime(src):
+                    self._write_capped(src, dst, max_size, keep_format=True)
+        return root
+
+    # -------- loaded images --------
+    def apply_to_groups(self, groups, use: str = "object"):
+        """Point every file-backed image used by the groups' materials at its capped copy."""
+        images = set()
+        for group in groups:
+            for obj in group:
+                for mat in getattr(obj.blender_obj.data, "materials", None) or []:
+                    if mat is None or not mat.use_nodes:
+                        continue
+                    images.update(n.image for n in mat.node_tree.nodes if getattr(n, "image", None) is not None)
+        for img in images:
+            if img.packed_file is not None or img.source != "FILE":
+                continue
+            src = bpy.path.abspath(img.filepath)
+            if not os.path.exists(src) or os.path.abspath(src).startswith(os.path.abspath(self.cache_dir)):
+                continue
+            img.filepath = self.cached_file(src, use)
+            img.reload()
+
+    # -------- internals --------
+    def _write_capped(self, src: str, dst: str, max_size: int, keep_format: bool = False):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.exists(dst) or os.path.islink(dst):
+            os.remove(dst)
+        img = bpy.data.images.load(src, check_existing=False)
+        try:
+            w, h = img.size
+            ext = os.path.splitext(src)[1].lower()
+            if max(w, h) <= max_size and (keep_format or ext in _FORMATS):
+                try:
+                    os.symlink(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+                return
+            if max(w, h) > max_size:
+                s = max_size / float(max(w, h))
+                img.scale(max(1, round(w * s)), max(1, round(h * s)))
+            img.filepath_raw = dst
+            img.file_format = _FORMATS.get(os.path.splitext(dst)[1].lower(), img.file_format)
+            img.save()
+        finally:
+            bpy.data.images.remove(img)
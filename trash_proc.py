@@ -1,4 +1,5 @@
 import blenderproc as bproc
+import bpy
 import os, random
 import numpy as np
 import sys
@@ -7,91 +8,281 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
-from asset_loader import AssetLoader
+from asset_loader import AssetLoader, LazyAssetLoader
+from asset_manifest import AssetManifest
+from class_sampler import ClassBalancedSampler
+from lod import LodCache, camera_positions
+from weathering import Weathering
+from weathering_variants import WeatheringVariants
+from texture_cache import TextureCache
+from room_library import RoomLibrary
+from render_presets import apply_render_preset, benchmark_presets, enable_index_pass_segmap, index_mesh_objects
+from render_threads import configure_threads, CpuMonitor
+from chunked_render import render_chunks
+from async_writer import AsyncCocoWriter
+from annotation_sink import JsonlSink
+from tar_shards import TarShardSink
+from mask_stats import drop_small_instances
+from visibility import instance_surface_pixels, ViewChecker
 from scene import Scene
+from scene_gc import SceneGC, RESTART_EXIT_CODE, PROGRESS_FILE
+from seeding import scene_seeds, seed_stage, append_scene_record
 from args import parse_script_args
 import json
 
 args = parse_script_args()
+# scene i derives one seed per stage from the run seed and i (seeding.py); an unseeded run still records its seed
+base_seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2**31)
+print(f"[info] Seed {base_seed}, first scene {args.first_scene}")
+random.seed(base_seed)
+np.random.seed(base_seed)
 
 # 1. Init BlenderProc
 bproc.init()
 
 # 2. Collect all assets (OBJ + BLEND) from folder
-loader = AssetLoader()  # reuse one loader
+loader = AssetLoader(cache_dir=args.asset_cache_dir)  # reuse one loader
 with open(ROOT / "configs/class_mapping.json", "r") as f:
     class_mappings = json.load(f)
 
-for category in class_mappings:
-    category_id = category["class_id"]
-    class_dir = category["class_dir"]
-    name = category["class_name"]
-    category_dir = os.path.join(ROOT, "assets", class_dir)
-    if not os.path.exists(category_dir):
-        print(f"[warn] Category directory does not exist: {category_dir}")
-        continue
-
-    # append results into loader.all_loaded_groups (default behaviour)
-    loader.load_assets(asset_dir=category_dir, category_id=category_id, category_name=name)
-
-# Apply random dust to all loaded objects
-#TODO: fix dust on legacy materials (e.g. non node)
-if args.apply_weathering:
-    loader.apply_weathering(
-        p_displace=0.65, p_simple=0.45, p_lattice=0.25, p_axis_scale=0.6,
-        apply_modifiers=False,                 # True to bake
-        dust_strength=(0.12, 0.28), dust_scale=(0.02, 0.08)
-    )
+lazy_loader = None
+if args.assets_per_scene > 0:
+    # only import what each scene samples; see scripts/build_asset_manifest.py
+    manifest = AssetManifest.load(ROOT / args.manifest, asset_root=ROOT / "assets")
+    if args.asset_cache_dir:
+        print("[warn] --asset_cache_dir is not used with --assets_per_scene; assets are imported from their source files")
+    lazy_loader = LazyAssetLoader(manifest, memory_budget_mb=args.asset_memory_mb, loader=loader)
+else:
+    for category in class_mappings:
+        category_id = category["class_id"]
+        class_dir = category["class_dir"]
+        name = category["class_name"]
+        category_dir = os.path.join(ROOT, "assets", class_dir)
+        if not os.path.exists(category_dir):
+            print(f"[warn] Category directory does not exist: {category_dir}")
+            continue
+
+        # append results into loader.all_loaded_groups (default behaviour)
+        loader.load_assets(asset_dir=category_dir, category_id=category_id, category_name=name)
 
 #3. Randomly place objects in scene
 # use accumulated groups:
 all_loaded_groups = loader.get_all_loaded_groups()
 print("Loaded object groups:", all_loaded_groups)
 
-scene = Scene(all_loaded_groups)
+textures = None
+if args.texture_cache_dir:
+    textures = TextureCache(ROOT / args.texture_cache_dir, max_size={
+        "background": args.max_background_texture,
+        "room": args.max_room_texture,
+        "object": args.max_object_texture,
+    })
+    textures.apply_to_groups(all_loaded_groups, "object")
+
+scene = Scene(all_loaded_groups, texture_cache=textures)
+# class-balanced choice of which assets appear in each scene (weights from class_mapping.json)
+sampler = ClassBalancedSampler(class_mappings)
+lods = LodCache(ROOT / args.lod_cache_dir) if args.lod_cache_dir else None
+variants = WeatheringVariants(ROOT / args.weathering_variants_dir) if args.weathering_variants_dir else None
 
-if args.random_room:
-    scene.add_random_room(
-        cc_material_dir=ROOT / "backgrounds" / "ccmaterials",
-        pix3d_dir=ROOT / "backgrounds" / "pix3d" / "model"
-    )
-    scene.place_objects_in_room()
+# Render settings are global to the session, so set them once
+bproc.renderer.set_output_format("JPEG")
+bproc.renderer.set_render_devices("CPU")  # or "GPU" if supported
+num_threads = configure_threads(args.num_threads, workers=args.workers_per_machine, worker_index=args.worker_index,
+                                pin_cpus=args.pin_cpus, tile_size=args.tile_size)
+cpu_monitor = CpuMonitor(num_threads).install()
+apply_render_preset(args.render_preset)  # samples, noise threshold, bounces, resolution, denoiser
+if args.single_pass_segmap:
+    # masks come from the IndexOB pass of the color render, no second pass over all camera poses
+    enable_index_pass_segmap()
 
-    for i in range(args.num_views):  # three random views
-        scene.add_camera_in_room()
+room_kwargs = dict(
+    cc_material_dir=ROOT / "backgrounds" / "ccmaterials",
+    pix3d_dir=ROOT / "backgrounds" / "pix3d" / "model",
+    num_materials=args.room_materials or None,
+    furniture_cache_dir=ROOT / args.furniture_cache_dir
+)
+room_library = None
+if args.random_room and args.room_library:
+    # construct rooms once; scenes below only randomize trash, lighting and cameras
+    room_library = RoomLibrary(ROOT / args.room_library)
+    room_library.build(scene, args.room_library_size, **room_kwargs)
 
-elif args.random_background:
-    scene.add_random_background(bg_folder=ROOT / "backgrounds" / "hdr")
-    scene.place_objects_randomly()
+writer = None
+if args.writer_threads > 0 or args.annotation_format != "json" or args.occlusion_stats:
+    # encoding overlaps with the next scene; submit() blocks when the queue is full
+    sink = None
+    if args.annotation_format == "jsonl":
+        sink = JsonlSink(args.output_dir)
+    elif args.annotation_format == "tar":
+        sink = TarShardSink(os.path.join(args.output_dir, "shards"), shard_size=args.shard_size, store_masks=args.shard_masks)
+    writer = AsyncCocoWriter(args.output_dir, num_workers=args.writer_threads,
+                             max_pending=max(16, 2 * args.render_chunk_size), sink=sink,
+                             min_visible_pixels=args.min_visible_pixels)
 
-    #Compute camera radius from scene (for camera placement)
-    center, base_radius = scene.find_camera_radius(distance_factor=1.5)
+def make_checker():
+    # built after objects and room are in place for the scene (LODs are picked later, from the cameras)
+    if args.min_visible_objects <= 0:
+        return None
+    return ViewChecker(scene.all_loaded_groups, min_objects=args.min_visible_objects,
+                       min_box_fraction=args.min_object_fraction)
 
-    #Add camera poses around scene
-    for i in range(args.num_views):  # three random views
-        scene.add_camera_poses(center, base_radius)
 
+gc = SceneGC(max_rss_mb=args.max_rss_mb)
+gc.keep(scene.resident_datablocks)
 
-    # 6. Add lights
-    scene.add_light("SUN", location=[0, 0, 5], energy=10)
+# image ids of the bproc writer continue after the ones already in its coco file
+next_image_id = 0
+coco_path = os.path.join(args.output_dir, "coco_annotations.json")
+if writer is None and os.path.exists(coco_path):
+    with open(coco_path, "r") as f:
+        next_image_id = max((img["id"] for img in json.load(f)["images"]), default=-1) + 1
 
-# 7. Render and save
-bproc.renderer.set_output_format("JPEG")
-bproc.renderer.set_max_amount_of_samples(1024)   # new API
-bproc.renderer.set_render_devices("CPU")  # or "GPU" if supported
-bproc.renderer.set_denoiser("INTEL")
-
-bproc.camera.set_resolution(1024, 1024)
-
-images = bproc.renderer.render()
-#bproc.writer.write_hdf5("output/", images)
-
-# 8. Save COCO annotations
-seg_data = bproc.renderer.render_segmap(map_by=["class", "instance"])
-bproc.writer.write_coco_annotations(
-    output_dir="output/coco_data",
-    instance_segmaps=seg_data["instance_segmaps"],
-    instance_attribute_maps=seg_data["instance_attribute_maps"],
-    colors=images["colors"],
-    color_file_format="JPEG"
-)
\ No newline at end of file
+# Every scene reuses the resident asset library; only poses, weathering,
+# room/background, lights and cameras are rebuilt.
+for scene_idx in range(args.num_scenes):
+    if scene_idx > 0:
+        scene.reset()
+        loader.clear_weathering(scene.all_loaded_groups)
+        gc.collect(f"Scene {scene_idx}")
+        if gc.over_limit():
+            # a fresh process is the only way to get memory back that Blender does not return
+            print(f"[warn] RSS {gc.last_rss_mb:.0f} MB above --max_rss_mb {args.max_rss_mb:.0f}, "
+                  f"stopping after {scene_idx} scenes for a restart")
+            if writer is not None:
+                writer.close()
+            with open(os.path.join(args.output_dir, PROGRESS_FILE), "w") as f:
+                json.dump({"scenes_done": scene_idx}, f)
+            sys.exit(RESTART_EXIT_CODE)
+    scene_index = args.first_scene + scene_idx
+    print(f"[info] Scene {scene_idx + 1}/{args.num_scenes} (index {scene_index})")
+    gc.begin_scene()
+    seeds = scene_seeds(base_seed, scene_index)
+    scene_assets = None
+
+    seed_stage(seeds, "assets")
+    if lazy_loader is not None:
+        entries = sampler.pick(lazy_loader.manifest.by_class(), args.assets_per_scene)
+        scene.set_groups(lazy_loader.acquire(entries))
+        if textures is not None:
+            textures.apply_to_groups(scene.all_loaded_groups, "object")
+    elif args.objects_per_scene > 0:
+        scene.select_subset(args.objects_per_scene, sampler)
+    if lazy_loader is not None or args.objects_per_scene > 0:
+        scene_assets = [{"source": g[0].get_cp("asset_source") if g[0].has_cp("asset_source") else g[0].get_name(),
+                         "class_id": g[0].get_cp("category_id") if g[0].has_cp("category_id") else None}
+                        for g in scene.all_loaded_groups]
+    if lods is not None:
+        # weathering below deforms the full-detail mesh; select() picks the level once the cameras exist
+        lods.restore(scene.all_loaded_groups)
+        lods.prepare(scene.all_loaded_groups)
+    checker = None
+    baked_groups = []
+
+    # Apply random dust to all loaded objects
+    #TODO: fix dust on legacy materials (e.g. non node)
+    if args.apply_weathering:
+        seed_stage(seeds, "weathering")
+        weathering_kwargs = dict(
+            seed=seeds["weathering"], base_seed=base_seed,
+            p_displace=0.65, p_simple=0.45, p_lattice=0.25, p_axis_scale=0.6,
+            apply_modifiers=False,                 # True to bake
+            dust_strength=(0.12, 0.28), dust_scale=(0.02, 0.08),
+            shared=args.shared_weathering, backend=args.weathering_backend,
+        )
+        live_groups = scene.all_loaded_groups
+        if variants is not None:
+            baked_groups, live_groups = variants.apply(scene.all_loaded_groups)
+            # baked shapes only need their materials aged
+            loader.apply_weathering(baked_groups, deform=False, **weathering_kwargs)
+        loader.apply_weathering(live_groups, **weathering_kwargs)
+
+    if args.random_room:
+        seed_stage(seeds, "layout")
+        if room_library is not None:
+            scene.use_room(room_library.load_random())
+        else:
+            scene.add_random_room(**room_kwargs)
+        seed_stage(seeds, "placement")
+        scene.place_objects_in_room()
+
+        seed_stage(seeds, "cameras")
+        checker = make_checker()
+        for i in range(args.num_views):  # three random views
+            scene.add_camera_in_room(checker=checker, max_tries=args.view_tries)
+
+    elif args.random_background:
+        seed_stage(seeds, "layout")
+        scene.add_random_background(bg_folder=ROOT / "backgrounds" / "hdr")
+        seed_stage(seeds, "placement")
+        scene.place_objects_randomly()
+
+        #Compute camera radius from scene (for camera placement)
+        center, base_radius = scene.find_camera_radius(distance_factor=1.5)
+
+        #Add camera poses around scene
+        seed_stage(seeds, "cameras")
+        checker = make_checker()
+        if args.view_candidates > 0:
+            scene.add_camera_poses_batched(center, base_radius, args.num_views, num_candidates=args.view_candidates,
+                                           checker=checker, min_box_fraction=args.min_object_fraction)
+        else:
+            for i in range(args.num_views):  # three random views
+                scene.add_camera_poses(center, base_radius, checker=checker, max_tries=args.view_tries)
+
+
+        # 6. Add lights
+        scene.add_light("SUN", location=[0, 0, 5], energy=10)
+
+    if lods is not None:
+        # baked variants only exist on the full-detail mesh
+        lods.select(scene.all_loaded_groups, camera_positions(),
+                    keep_full={o.blender_obj.name for g in baked_groups for o in g})
+        Weathering.follow_mesh_swaps(scene.all_loaded_groups)
+
+    if checker is not None and checker.rejected:
+        print(f"[info] Rejected {checker.rejected} camera poses before rendering")
+
+    if args.benchmark_presets:
+        benchmark_presets(output_path=os.path.join(args.output_dir, "render_benchmark.json"))
+        break
+
+    # 7. Render and save
+    seed_stage(seeds, "render")
+    bpy.context.scene.cycles.seed = seeds["render"] % 2**31
+    first_image_id = writer.next_image_id if writer is not None else next_image_id
+    if args.single_pass_segmap:
+        index_mesh_objects()
+
+    # 8. Save COCO annotations (appends to the existing file across scenes and chunks)
+    for frames, images, seg_data in render_chunks(args.render_chunk_size, args.single_pass_segmap, cpu_monitor):
+        if writer is not None:
+            # surface points are projected here, the writer threads must not touch bpy
+            pixels = instance_surface_pixels(frames) if args.occlusion_stats else None
+            writer.submit(images["colors"], seg_data["instance_segmaps"], seg_data["instance_attribute_maps"], pixels)
+            continue
+        segmaps = seg_data["instance_segmaps"]
+        if args.min_visible_pixels > 1:
+            segmaps = [drop_small_instances(m, args.min_visible_pixels) for m in segmaps]
+        bproc.writer.write_coco_annotations(
+            output_dir=args.output_dir,
+            instance_segmaps=segmaps,
+            instance_attribute_maps=seg_data["instance_attribute_maps"],
+            colors=images["colors"],
+            color_file_format="JPEG",
+            append_to_existing_output=True
+        )
+        next_image_id += len(images["colors"])
+    if writer is not None:
+        writer.flush(wait=False)
+    end_image_id = writer.next_image_id if writer is not None else next_image_id
+    # everything needed to regenerate this scene alone: --seed base_seed --first_scene scene_index --num_scenes 1
+    append_scene_record(args.output_dir, {
+        "scene": scene_index, "seed": base_seed, "stage_seeds": seeds,
+        "image_ids": list(range(first_image_id, end_image_id)), "assets": scene_assets,
+    })
+
+if writer is not None:
+    writer.close()
+print("[info] Class counts:", sampler.summary())
+print("[info] CPU:", cpu_monitor.summary())
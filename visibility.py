@@ -0,0 +1,127 @@
+# visibility.py
+from typing import Dict, List
+import bpy
+import numpy as np
+from mathutils import Vector
+import blenderproc as bproc
+
+
+def camera_projection(frame: int):
+    """(world2cam 4x4 in Blender camera axes, K 3x3, (width, height)) of the camera at frame."""
+    world2cam = np.linalg.inv(bproc.camera.get_camera_pose(frame))
+    render = bpy.context.scene.render
+    return world2cam, bproc.camera.get_intrinsics_as_K_matrix(), (render.resolution_x, render.resolution_y)
+
+
+def project(points: np.ndarray, world2cam: np.ndarray, K: np.ndarray):
+    """Pixel coordinates [N, 2] (x right, y down) and depth [N] of world points [N, 3]."""
+    cam = points @ world2cam[:3, :3].T + world2cam[:3, 3]
+    depth = -cam[:, 2]  # Blender cameras look along -Z
+    safe = np.where(depth > 1e-6, depth, 1e-6)
+    x = K[0, 0] * cam[:, 0] / safe + K[0, 2]
+    y = K[1, 1] * -cam[:, 1] / safe + K[1, 2]
+    return np.stack([x, y], axis=1), depth
+
+
+def surface_samples(obj: bproc.types.MeshObject, max_points: int = 2000, rng=np.random):
+    """World positions and normals of up to max_points vertices of the evaluated mesh (modifiers applied)."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated = obj.blender_obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        n = len(mesh.vertices)
+        co, normal = np.empty(n * 3, dtype=np.float32), np.empty(n * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        mesh.vertices.foreach_get("normal", normal)
+    finally:
+        evaluated.to_mesh_clear()
+    co, normal = co.reshape(-1, 3), normal.reshape(-1, 3)
+    if n > max_points:
+        pick = rng.choice(n, max_points, replace=False)
+        co, normal = co[pick], normal[pick]
+    mat = np.asarray(evaluated.matrix_world)
+    co = co @ mat[:3, :3].T + mat[:3, 3]
+    normal = normal @ np.linalg.inv(mat[:3, :3])  # inverse transpose for normals
+    return co, normal
+
+
+def facing_pixels(samples, frame: int) -> np.ndarray:
+    """Integer pixel coordinates of the samples that face the camera at frame and lie in front of it."""
+    co, normal = samples
+    world2cam, K, _ = camera_projection(frame)
+    cam_pos = np.linalg.inv(world2cam)[:3, 3]
+    px, depth = project(co, world2cam, K)
+    facing = (np.einsum("ij,ij->i", normal, cam_pos - co) > 0) & (depth > 0)
+    return np.floor(px[facing]).astype(np.int64)
+
+
+def instance_surface_pixels(frames: range, max_points: int = 2000) -> List[Dict[int, np.ndarray]]:
+    """
+    Per frame {segmap instance idx: camera-facing surface pixels} for all visible annotated
+    objects (those with a category_id). idx follows render_segmap / enable_segmentation_output
+    (index in the mesh object list + 1). Feed to mask_stats.occlusion to estimate how much of
+    each object is hidden; surfaces hidden by the object itself (concave parts) count as occluded.
+    """
+    objects = bproc.object.get_all_mesh_objects()
+    samples = {i + 1: surface_samples(o, max_points) for i, o in enumerate(objects)
+               if o.has_cp("category_id") and not o.blender_obj.hide_render}
+    return [{idx: facing_pixels(s, frame) for idx, s in samples.items()} for frame in frames]
+
+
+class ViewChecker:
+    """
+    Cheap pre-render test of camera poses for one scene layout.
+
+    An annotated object counts as seen from a pose if the projection of its bounding box,
+    clipped to the image, covers at least min_box_fraction of the image and at least one of
+    a few camera-facing surface points is not hidden behind other geometry (ray cast against
+    a BVH of all rendered meshes, built once). A pose is good if min_objects objects are seen.
+    Build it after objects and room are in place; it does not follow later changes. LODs are
+    only chosen once the cameras exist, so occlusion is tested against the full-detail
+    meshes, which differ from the rendered levels by less than a pixel or two (see LodCache).
+    """
+    def __init__(self, groups, min_objects: int = 1, min_box_fraction: float = 0.0005, rays_per_object: int = 8):
+        self.min_objects = min_objects
+        self.min_box_fraction = min_box_fraction
+        objects = [o for g in groups for o in g if not o.blender_obj.hide_render]
+        self.targets = [(np.asarray(o.get_bound_box()), surface_samples(o, rays_per_object)) for o in objects]
+        occluders = [o for o in bproc.object.get_all_mesh_objects() if not o.blender_obj.hide_render]
+        self.bvh = bproc.object.create_bvh_tree_multi_objects(occluders)
+        render = bpy.context.scene.render
+        self.K = bproc.camera.get_intrinsics_as_K_matrix()
+        self.resolution = (render.resolution_x, render.resolution_y)
+        self.rejected = 0  # poses resampled by Scene because too few objects were seen
+
+    def count_visible(self, cam2world: np.ndarray) -> int:
+        world2cam = np.linalg.inv(cam2world)
+        cam_pos = np.asarray(cam2world)[:3, 3]
+        w, h = self.resolution
+        min_area = self.min_box_fraction * w * h
+        seen = 0
+        for corners, (co, normal) in self.targets:
+            px, depth = project(corners, world2cam, self.K)
+            front = depth > 0
+            if not front.any():
+                continue
+            x0, y0 = np.maximum(px[front].min(axis=0), 0)
+            x1, y1 = np.minimum(px[front].max(axis=0), (w, h))
+            if max(0.0, x1 - x0) * max(0.0, y1 - y0) < min_area:
+                continue
+            if self._any_point_visible(co, normal, cam_pos, world2cam):
+                seen += 1
+        return seen
+
+    def _any_point_visible(self, co, normal, cam_pos, world2cam) -> bool:
+        w, h = self.resolution
+        px, depth = project(co, world2cam, self.K)
+        candidates = (np.einsum("ij,ij->i", normal, cam_pos - co) > 0) & (depth > 0) \
+            & (px[:, 0] >= 0) & (px[:, 0] < w) & (px[:, 1] >= 0) & (px[:, 1] < h)
+        origin = Vector(cam_pos)
+        for p in co[candidates]:
+            ray = p - cam_pos
+            dist = float(np.linalg.norm(ray))
+            hit = self.bvh.ray_cast(origin, Vector(ray / dist), dist * 1.05)
+            # the BVH holds undeformed meshes, so allow some slack for weathering displacement
+            if hit[0] is None or hit[3] >= dist * 0.98:
+                return True
+        return False
@@ -1,9 +1,39 @@
 import random, math
 import bpy
+import numpy as np
 import blenderproc as bproc
+import mesh_deform
+
+SHARED_PREFIX = "wx_shared_"
+# object name -> {"recipe": deformation steps, "meshes": [(mesh, undeformed positions)]} for objects
+# deformed by the numpy backend (several meshes when LOD levels are swapped in, see follow_mesh_swaps)
+_DEFORMED = {}
+
 
 class Weathering:
-    """Category-agnostic 'trash-ify': subtle deforms + material aging."""
+    """
+    Category-agnostic 'trash-ify': subtle deforms + material aging.
+
+    With shared=True textures, lattice data and dust node groups come from session-wide pools:
+    displace modifiers pick one of shared_pool_size CLOUDS textures, lattice modifiers one of
+    shared_pool_size pre-jittered lattice datablocks, and dust uses a single "wx_shared_dust"
+    node group whose flake pattern and strength vary per object through Object Info > Random.
+    The pool is created on first use and reused for the whole session. Each lattice modifier
+    still needs its own lattice object (it carries the weathered object's transform); these
+    are removed again by strip_groups().
+
+    With backend="numpy" the same deformations (drawn from the same ranges) are computed on
+    the vertex array in mesh_deform.py and written into the mesh with one foreach_set: no
+    modifiers, lattice objects, textures or bpy.ops. The undeformed positions are kept, so
+    strip_groups() restores the mesh and every scene starts from the original shape. Meshes
+    swapped in later (LOD levels) get the same deformation through follow_mesh_swaps().
+
+    All draws come from self.rng (seeded by seed). Material aging and the shared pools draw from
+    generators keyed by base_seed and the datablock name instead, because they happen once per
+    session: this way their look does not depend on which scene touched them first.
+    """
+    _dust_group_unsupported = False  # set once bproc's dust group turned out not to match _shared_dust_group
+
     def __init__(
         self,
         *,
@@ -25,10 +55,16 @@ class Weathering:
         roughness_jitter=(-0.20, 0.20),
         basecolor_mult=(0.85, 0.95),
         # general
+        deform=True,                       # False to only age materials (e.g. with baked variants)
+        age_materials=True,                # False to only deform; each material is aged at most once anyway
+        shared=False,                      # reuse pooled textures/lattices and one dust node group (see below)
+        shared_pool_size=8,
+        backend="modifiers",               # "numpy": deform the vertex array directly (see above)
         apply_modifiers=False,
         min_diag=0.05,
         max_diag=None,
-        seed=None,
+        seed=None,                         # seed of this pass; None draws one from the global `random`
+        base_seed=None,                    # seed of the run for material aging and the shared pools (see below)
     ):
         self.p_displace = p_displace
         self.p_simple = p_simple
@@ -47,11 +83,21 @@ class Weathering:
         self.roughness_jitter = roughness_jitter
         self.basecolor_mult = basecolor_mult
 
+        self.deform = deform
+        self.age_materials = age_materials
+        self.shared = shared
+        self.shared_pool_size = max(1, shared_pool_size)
+        if backend not in ("modifiers", "numpy"):
+            raise ValueError(f"Unknown weathering backend {backend}")
+        self.backend = backend
         self.apply_modifiers = apply_modifiers
         self.min_diag = min_diag
         self.max_diag = max_diag
-        if seed is not None:
-            random.seed(seed)
+        # own generator, so weathering neither reseeds nor consumes the caller's global `random`
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
+        self.base_seed = base_seed
+        # object name -> [{"op": ..., params}] of the deformations drawn for it
+        self.history = {}
 
     # -------- public API --------
     def apply_to_groups(self, groups):
@@ -63,6 +109,25 @@ class Weathering:
         for bp_obj in bproc.scene.get_objects():
             self._process(bp_obj)
 
+    @staticmethod
+    def strip_groups(groups):
+        """
+        Remove live (non-applied) wx_* modifiers and their helper lattices, and restore meshes
+        deformed by the numpy backend, so groups can be re-weathered.
+        """
+        for group in groups:
+            for bp_obj in group:
+                bpy_obj = bp_obj.blender_obj
+                if bpy_obj is None or bpy_obj.type != "MESH":
+                    continue
+                Weathering._restore_rest_positions(bpy_obj)
+                for m in [m for m in bpy_obj.modifiers if m.name.startswith("wx_")]:
+                    lat = getattr(m, "object", None) if m.type == "LATTICE" else None
+                    bpy_obj.modifiers.remove(m)
+                    if lat is not None:
+                        try: bpy.data.objects.remove(lat, do_unlink=True)
+                        except Exception: pass
+
     # -------- internals --------
     def _process(self, bp_obj):
         bpy_obj = bp_obj.blender_obj
@@ -74,45 +139,56 @@ class Weathering:
         if self.max_diag is not None and diag > self.max_diag: return
 
         # geometry (probabilistic)
-        if random.random() < self.p_displace: self._add_displace(bpy_obj, diag)
-        if random.random() < self.p_simple:   self._add_simple(bpy_obj, diag)
-        if random.random() < self.p_lattice:  self._add_lattice(bpy_obj, diag)
-        if random.random() < self.p_axis_scale: self._axis_scale(bpy_obj)
+        if self.deform:
+            self.history[bpy_obj.name] = []
+            if self.backend == "numpy":
+                self._deform_vertices(bpy_obj, diag)
+            else:
+                if self.rng.random() < self.p_displace: self._add_displace(bpy_obj, diag)
+                if self.rng.random() < self.p_simple:   self._add_simple(bpy_obj, diag)
+                if self.rng.random() < self.p_lattice:  self._add_lattice(bpy_obj, diag)
+                if self.rng.random() < self.p_axis_scale: self._axis_scale(bpy_obj)
 
         # materials
-        self._age_materials(bpy_obj)
+        if self.age_materials:
+            self._age_materials(bpy_obj)
 
     # -- geometry ops --
     def _add_displace(self, bpy_obj, diag):
-        tex = bpy.data.textures.new("wx_disp_tex", type="CLOUDS")
-        tex.noise_scale = random.uniform(*self.disp_noise_scale)
+        if self.shared:
+            tex = self.rng.choice(self._shared_textures())
+        else:
+            tex = bpy.data.textures.new("wx_disp_tex", type="CLOUDS")
+            tex.noise_scale = self.rng.uniform(*self.disp_noise_scale)
         m = bpy_obj.modifiers.new(name="wx_displace", type="DISPLACE")
         m.texture = tex
         kmin, kmax = self.disp_strength_per_diag
-        m.strength = random.uniform(kmin, kmax) * diag
+        m.strength = self.rng.uniform(kmin, kmax) * diag
         m.mid_level = 0.5
+        self._record(bpy_obj, "displace", texture=tex.name, noise_scale=tex.noise_scale, strength=m.strength)
         self._maybe_apply(bpy_obj, m)
 
     def _add_simple(self, bpy_obj, diag):
         m = bpy_obj.modifiers.new(name="wx_simple", type="SIMPLE_DEFORM")
-        m.deform_method = random.choice(["BEND", "TWIST", "TAPER", "STRETCH"])
-        m.deform_axis = random.choice(["X", "Y", "Z"])
+        m.deform_method = self.rng.choice(["BEND", "TWIST", "TAPER", "STRETCH"])
+        m.deform_axis = self.rng.choice(["X", "Y", "Z"])
         size = min(1.0, max(0.3, diag))
         if m.deform_method in {"BEND", "TWIST"}:
             amin, amax = self.simple_angle_deg
-            m.angle = math.radians(random.uniform(amin, amax) * size)
+            m.angle = math.radians(self.rng.uniform(amin, amax) * size)
         else:
             fmin, fmax = self.simple_factor
-            m.factor = random.uniform(fmin, fmax) * size
+            m.factor = self.rng.uniform(fmin, fmax) * size
+        self._record(bpy_obj, "simple", method=m.deform_method, axis=m.deform_axis, angle=m.angle, factor=m.factor)
         self._maybe_apply(bpy_obj, m)
 
     def _add_lattice(self, bpy_obj, diag):
-        lat_data = bpy.data.lattices.new("wx_lat_data")
+        if self.shared:
+            lat_data = self.rng.choice(self._shared_lattices())
+        else:
+            lat_data = bpy.data.lattices.new("wx_lat_data")
         lat = bpy.data.objects.new("wx_lat", lat_data)
         bpy.context.scene.collection.objects.link(lat)
-        lat_data.points_u = random.choice([2,3,4])
-        lat_data.points_v = random.choice([2,3,4])
-        lat_data.points_w = random.choice([2,3,4])
 
         lat.location = bpy_obj.location
         lat.rotation_euler = bpy_obj.rotation_euler
@@ -121,11 +197,13 @@ class Weathering:
         m = bpy_obj.modifiers.new(name="wx_lattice_mod", type="LATTICE")
         m.object = lat
 
-        j = self.lattice_jitter_per_diag * diag
-        for p in lat_data.points:
-            p.co_deform[0] += random.uniform(-j, j)
-            p.co_deform[1] += random.uniform(-j, j)
-            p.co_deform[2] += random.uniform(-j, j)
+        if not self.shared:
+            lat_data.points_u = self.rng.choice([2,3,4])
+            lat_data.points_v = self.rng.choice([2,3,4])
+            lat_data.points_w = self.rng.choice([2,3,4])
+            self._jitter_lattice(lat_data, self.lattice_jitter_per_diag * diag, self.rng)
+        self._record(bpy_obj, "lattice", lattice=lat_data.name,
+                     points=[lat_data.points_u, lat_data.points_v, lat_data.points_w])
 
         self._maybe_apply(bpy_obj, m)
         if self.apply_modifiers:
@@ -134,203 +212,109 @@ class Weathering:
 
     def _axis_scale(self, bpy_obj):
         rmin, rmax = self.axis_scale_delta
-        sx = 1 + random.uniform(rmin, rmax)
-        sy = 1 + random.uniform(rmin, rmax)
-        sz = 1 + random.uniform(rmin, rmax)
+        sx = 1 + self.rng.uniform(rmin, rmax)
+        sy = 1 + self.rng.uniform(rmin, rmax)
+        sz = 1 + self.rng.uniform(rmin, rmax)
         bpy_obj.scale[0] *= sx; bpy_obj.scale[1] *= sy; bpy_obj.scale[2] *= sz
+        self._record(bpy_obj, "axis_scale", scale=[sx, sy, sz])
 
-    # -- material ops --
-    def _age_materials(self, bpy_obj):
-        mats = getattr(bpy_obj.data, "materials", None) or []
-        for bpy_mat in mats:
-            if bpy_mat is None or not getattr(bpy_mat, "use_nodes", False):
-                continue
-            try:
-                bp_mat = bproc.types.Material(bpy_mat)  # safe now (nodes only)
-            except Exception:
-                continue
-
-            nt = getattr(bpy_mat, "node_tree", None)
-            if nt:
-                principled = next((n for n in nt.nodes if getattr(n, "type", "") == "BSDF_PRINCIPLED"), None)
-                if principled:
-                    # roughness jitter (multiplicative, clamped)
-                    r_in = principled.inputs.get("Roughness")
-                    if r_in and not r_in.is_linked:
-                        cur = float(r_in.default_value)
-                        mult = 1 + random.uniform(*self.roughness_jitter)
-                        r_in.default_value = max(0.0, min(1.0, cur * mult))
-                    # base color multiplier
-                    c_in = principled.inputs.get("Base Color")
-                    if c_in and not c_in.is_linked:
-                        r,g,b,a = c_in.default_value
-                        m = random.uniform(*self.basecolor_mult)
-                        c_in.default_value = (r*m, g*m, b*m, a)
-
-            # dust (skip failures silently)
-            try:
-                bproc.material.add_dust(
-                    bp_mat,
-                    strength=random.uniform(*self.dust_strength),
-                    texture_scale=random.uniform(*self.dust_scale),
-                )
-            except Exception:
-                pass
-
-    # -- utils --
-    def _diag(self, bpy_obj):
-        d = bpy_obj.dimensions
-        return float((d.x*d.x + d.y*d.y + d.z*d.z) ** 0.5)
-
-    def _maybe_apply(self, bpy_obj, mod):
-        if not self.apply_modifiers: return
-        try:
-            bpy.context.view_layer.objects.active = bpy_obj
-            bpy.ops.object.modifier_apply(modifier=mod.name)
-        except Exception:
-            pass
-# --- end weathering.py ---
-# --- weathering.py ---
-import random, math
-import bpy
-import blenderproc as bproc
-
-class Weathering:
-    """Category-agnostic 'trash-ify': subtle deforms + material aging."""
-    def __init__(
-        self,
-        *,
-        # probabilities (apply independently)
-        p_displace=0.65,
-        p_simple=0.45,
-        p_lattice=0.25,
-        p_axis_scale=0.60,
-        # intensities (good for ~0.1–1 m objects)
-        disp_noise_scale=(0.2, 1.0),
-        disp_strength_per_diag=(0.003, 0.02),
-        simple_angle_deg=(5.0, 15.0),      # for BEND/TWIST
-        simple_factor=(-0.10, 0.10),       # for TAPER/STRETCH
-        lattice_jitter_per_diag=0.03,
-        axis_scale_delta=(-0.07, 0.05),
-        # material aging
-        dust_strength=(0.12, 0.28),
-        dust_scale=(0.02, 0.08),
-        roughness_jitter=(-0.20, 0.20),
-        basecolor_mult=(0.85, 0.95),
-        # general
-        apply_modifiers=False,
-        min_diag=0.05,
-        max_diag=None,
-        seed=None,
-    ):
-        self.p_displace = p_displace
-        self.p_simple = p_simple
-        self.p_lattice = p_lattice
-        self.p_axis_scale = p_axis_scale
-
-        self.disp_noise_scale = disp_noise_scale
-        self.disp_strength_per_diag = disp_strength_per_diag
-        self.simple_angle_deg = simple_angle_deg
-        self.simple_factor = simple_factor
-        self.lattice_jitter_per_diag = lattice_jitter_per_diag
-        self.axis_scale_delta = axis_scale_delta
-
-        self.dust_strength = dust_strength
-        self.dust_scale = dust_scale
-        self.roughness_jitter = roughness_jitter
-        self.basecolor_mult = basecolor_mult
-
-        self.apply_modifiers = apply_modifiers
-        self.min_diag = min_diag
-        self.max_diag = max_diag
-        if seed is not None:
-            random.seed(seed)
-
-    # -------- public API --------
-    def apply_to_groups(self, groups):
+    # -- numpy backend --
+    def _deform_vertices(self, bpy_obj, diag):
+        self._restore_rest_positions(bpy_obj)
+        mesh = bpy_obj.data
+        if len(mesh.vertices) == 0:
+            return
+        co, _ = self._read_vertices(mesh)
+
+        # the drawn deformation is kept as a recipe, so it can be replayed on other meshes of the
+        # object (LOD levels); noise tables come from a seed drawn off self.rng, so a seeded run repeats
+        recipe = []
+        if self.rng.random() < self.p_displace:
+            noise_scale = self.rng.uniform(*self.disp_noise_scale)
+            strength = self.rng.uniform(*self.disp_strength_per_diag) * diag
+            recipe.append({"op": "displace", "noise_scale": noise_scale, "strength": strength,
+                           "noise_seed": self.rng.getrandbits(32)})
+        if self.rng.random() < self.p_simple:
+            method = self.rng.choice(["BEND", "TWIST", "TAPER", "STRETCH"])
+            axis = self.rng.choice(["X", "Y", "Z"])
+            size = min(1.0, max(0.3, diag))
+            if method in {"BEND", "TWIST"}:
+                amount = math.radians(self.rng.uniform(*self.simple_angle_deg) * size)
+            else:
+                amount = self.rng.uniform(*self.simple_factor) * size
+            recipe.append({"op": "simple", "method": method, "axis": axis, "amount": amount})
+        if self.rng.random() < self.p_lattice:
+            points = [self.rng.choice([2,3,4]) for _ in range(3)]
+            # same box and jitter as the lattice object of the modifier backend
+            size = 0.6 * (co.max(axis=0) - co.min(axis=0))
+            j = self.lattice_jitter_per_diag * diag
+            offsets = np.random.default_rng(self.rng.getrandbits(32)).uniform(-j, j, size=points + [3]) * size
+            recipe.append({"op": "lattice", "points": points, "size": size.tolist(), "offsets": offsets.tolist()})
+        if self.rng.random() < self.p_axis_scale:
+            rmin, rmax = self.axis_scale_delta
+            recipe.append({"op": "axis_scale", "scale": [1 + self.rng.uniform(rmin, rmax) for _ in range(3)]})
+
+        for step in recipe:
+            self._record(bpy_obj, **{k: v for k, v in step.items() if k != "offsets"})
+        if recipe:
+            _DEFORMED[bpy_obj.name] = {"recipe": recipe, "meshes": []}
+            self._deform_mesh(bpy_obj.name, mesh)
+
+    @staticmethod
+    def follow_mesh_swaps(groups):
+        """
+        Deform meshes swapped into numpy-weathered objects since weathering (e.g. the LOD picked
+        by LodCache.select) with the same recipe, so every level shows the same weathered shape.
+        """
         for group in groups:
             for bp_obj in group:
-                self._process(bp_obj)
-
-    def apply_to_all_scene_meshes(self):
-        for bp_obj in bproc.scene.get_objects():
-            self._process(bp_obj)
-
-    # -------- internals --------
-    def _process(self, bp_obj):
-        bpy_obj = bp_obj.blender_obj
-        if bpy_obj is None or bpy_obj.type != "MESH":
+                bpy_obj = bp_obj.blender_obj
+                entry = _DEFORMED.get(bpy_obj.name)
+                if entry is not None and all(m is not bpy_obj.data for m, _ in entry["meshes"]):
+                    Weathering._deform_mesh(bpy_obj.name, bpy_obj.data)
+
+    @staticmethod
+    def _read_vertices(mesh):
+        n = len(mesh.vertices)
+        co = np.empty(n * 3, dtype=np.float32)
+        normals = np.empty(n * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        mesh.vertices.foreach_get("normal", normals)
+        return co.reshape(-1, 3).astype(np.float64), normals.reshape(-1, 3).astype(np.float64)
+
+    @staticmethod
+    def _deform_mesh(name, mesh):
+        entry = _DEFORMED[name]
+        co, normals = Weathering._read_vertices(mesh)
+        rest = co.astype(np.float32).ravel()
+        for step in entry["recipe"]:
+            op = step["op"]
+            if op == "displace":
+                co = mesh_deform.displace(co, normals, step["strength"], step["noise_scale"],
+                                          np.random.default_rng(step["noise_seed"]))
+            elif op == "simple":
+                co = mesh_deform.simple_deform(co, step["method"], step["axis"], step["amount"])
+            elif op == "lattice":
+                size = np.asarray(step["size"])
+                co = mesh_deform.lattice_ffd(co, np.asarray(step["offsets"]), np.zeros(3), size)
+            elif op == "axis_scale":
+                co = mesh_deform.axis_scale(co, step["scale"])
+        mesh.vertices.foreach_set("co", co.astype(np.float32).ravel())
+        mesh.update()
+        entry["meshes"].append((mesh, rest))
+
+    @staticmethod
+    def _restore_rest_positions(bpy_obj):
+        entry = _DEFORMED.pop(bpy_obj.name, None)
+        if entry is None:
             return
-
-        diag = self._diag(bpy_obj)
-        if diag < self.min_diag: return
-        if self.max_diag is not None and diag > self.max_diag: return
-
-        # geometry (probabilistic)
-        if random.random() < self.p_displace: self._add_displace(bpy_obj, diag)
-        if random.random() < self.p_simple:   self._add_simple(bpy_obj, diag)
-        if random.random() < self.p_lattice:  self._add_lattice(bpy_obj, diag)
-        if random.random() < self.p_axis_scale: self._axis_scale(bpy_obj)
-
-        # materials
-        self._age_materials(bpy_obj)
-
-    # -- geometry ops --
-    def _add_displace(self, bpy_obj, diag):
-        tex = bpy.data.textures.new("wx_disp_tex", type="CLOUDS")
-        tex.noise_scale = random.uniform(*self.disp_noise_scale)
-        m = bpy_obj.modifiers.new(name="wx_displace", type="DISPLACE")
-        m.texture = tex
-        kmin, kmax = self.disp_strength_per_diag
-        m.strength = random.uniform(kmin, kmax) * diag
-        m.mid_level = 0.5
-        self._maybe_apply(bpy_obj, m)
-
-    def _add_simple(self, bpy_obj, diag):
-        m = bpy_obj.modifiers.new(name="wx_simple", type="SIMPLE_DEFORM")
-        m.deform_method = random.choice(["BEND", "TWIST", "TAPER", "STRETCH"])
-        m.deform_axis = random.choice(["X", "Y", "Z"])
-        size = min(1.0, max(0.3, diag))
-        if m.deform_method in {"BEND", "TWIST"}:
-            amin, amax = self.simple_angle_deg
-            m.angle = math.radians(random.uniform(amin, amax) * size)
-        else:
-            fmin, fmax = self.simple_factor
-            m.factor = random.uniform(fmin, fmax) * size
-        self._maybe_apply(bpy_obj, m)
-
-    def _add_lattice(self, bpy_obj, diag):
-        lat_data = bpy.data.lattices.new("wx_lat_data")
-        lat = bpy.data.objects.new("wx_lat", lat_data)
-        bpy.context.scene.collection.objects.link(lat)
-        lat_data.points_u = random.choice([2,3,4])
-        lat_data.points_v = random.choice([2,3,4])
-        lat_data.points_w = random.choice([2,3,4])
-
-        lat.location = bpy_obj.location
-        lat.rotation_euler = bpy_obj.rotation_euler
-        lat.scale = bpy_obj.dimensions * 0.6
-
-        m = bpy_obj.modifiers.new(name="wx_lattice_mod", type="LATTICE")
-        m.object = lat
-
-        j = self.lattice_jitter_per_diag * diag
-        for p in lat_data.points:
-            p.co_deform[0] += random.uniform(-j, j)
-            p.co_deform[1] += random.uniform(-j, j)
-            p.co_deform[2] += random.uniform(-j, j)
-
-        self._maybe_apply(bpy_obj, m)
-        if self.apply_modifiers:
-            try: bpy.data.objects.remove(lat, do_unlink=True)
-            except Exception: pass
-
-    def _axis_scale(self, bpy_obj):
-        rmin, rmax = self.axis_scale_delta
-        sx = 1 + random.uniform(rmin, rmax)
-        sy = 1 + random.uniform(rmin, rmax)
-        sz = 1 + random.uniform(rmin, rmax)
-        bpy_obj.scale[0] *= sx; bpy_obj.scale[1] *= sy; bpy_obj.scale[2] *= sz
+        for mesh, rest in entry["meshes"]:
+            try:
+                if len(mesh.vertices) * 3 == len(rest):
+                    mesh.vertices.foreach_set("co", rest)
+                    mesh.update()
+            except ReferenceError:
+                pass  # mesh was freed in the meantime
 
     # -- material ops --
     def _age_materials(self, bpy_obj):
@@ -338,10 +322,15 @@ class Weathering:
         for bpy_mat in mats:
             if bpy_mat is None or not getattr(bpy_mat, "use_nodes", False):
                 continue
+            # aging edits the shared material in place, so re-weathering must not stack it
+            if bpy_mat.get("wx_aged"):
+                continue
             try:
                 bp_mat = bproc.types.Material(bpy_mat)  # safe now (nodes only)
             except Exception:
                 continue
+            bpy_mat["wx_aged"] = True
+            rng = self._keyed_rng(f"material:{bpy_mat.name}")
 
             nt = getattr(bpy_mat, "node_tree", None)
             if nt:
@@ -351,34 +340,145 @@ class Weathering:
                     r_in = principled.inputs.get("Roughness")
                     if r_in and not r_in.is_linked:
                         cur = float(r_in.default_value)
-                        mult = 1 + random.uniform(*self.roughness_jitter)
+                        mult = 1 + rng.uniform(*self.roughness_jitter)
                         r_in.default_value = max(0.0, min(1.0, cur * mult))
                     # base color multiplier
                     c_in = principled.inputs.get("Base Color")
                     if c_in and not c_in.is_linked:
                         r,g,b,a = c_in.default_value
-                        m = random.uniform(*self.basecolor_mult)
+                        m = rng.uniform(*self.basecolor_mult)
                         c_in.default_value = (r*m, g*m, b*m, a)
 
             # dust (skip failures silently)
             try:
-                bproc.material.add_dust(
-                    bp_mat,
-                    strength=random.uniform(*self.dust_strength),
-                    texture_scale=random.uniform(*self.dust_scale),
-                )
+                if self.shared and self._shared_dust_group() is not None:
+                    self._add_shared_dust(bp_mat, rng.uniform(*self.dust_strength), rng.uniform(*self.dust_scale))
+                else:
+                    bproc.material.add_dust(
+                        bp_mat,
+                        strength=rng.uniform(*self.dust_strength),
+                        texture_scale=rng.uniform(*self.dust_scale),
+                    )
             except Exception:
                 pass
 
+    # -- shared datablocks (looked up by name, so every Weathering of the session reuses them) --
+    def _shared_textures(self):
+        lo, hi = self.disp_noise_scale
+        textures = []
+        for i in range(self.shared_pool_size):
+            name = f"{SHARED_PREFIX}disp_{i}"
+            tex = bpy.data.textures.get(name) or bpy.data.textures.new(name, type="CLOUDS")
+            tex.use_fake_user = True
+            # spread over the noise scale range instead of drawing one per object
+            tex.noise_scale = lo + (hi - lo) * (i + 0.5) / self.shared_pool_size
+            textures.append(tex)
+        return textures
+
+    def _shared_lattices(self):
+        lattices = []
+        for i in range(self.shared_pool_size):
+            name = f"{SHARED_PREFIX}lat_{i}"
+            lat_data = bpy.data.lattices.get(name)
+            if lat_data is None:
+                rng = self._keyed_rng(name)
+                lat_data = bpy.data.lattices.new(name)
+                lat_data.points_u = rng.choice([2,3,4])
+                lat_data.points_v = rng.choice([2,3,4])
+                lat_data.points_w = rng.choice([2,3,4])
+                # lattice space is scaled to the object, so the jitter is relative to its size
+                self._jitter_lattice(lat_data, self.lattice_jitter_per_diag, rng)
+                lat_data.use_fake_user = True
+            lattices.append(lat_data)
+        return lattices
+
+    @staticmethod
+    def _jitter_lattice(lat_data, j, rng):
+        for p in lat_data.points:
+            p.co_deform[0] += rng.uniform(-j, j)
+            p.co_deform[1] += rng.uniform(-j, j)
+            p.co_deform[2] += rng.uniform(-j, j)
+
+    def _shared_dust_group(self):
+        """The shared dust group, or None (per-material dust) if bproc's dust group has an unexpected layout."""
+        name = f"{SHARED_PREFIX}dust"
+        group = bpy.data.node_groups.get(name)
+        if group is not None or Weathering._dust_group_unsupported:
+            return group
+        # let bproc build its dust group once on a scratch material, then keep only the group
+        scratch = bproc.material.create("wx_scratch")
+        bproc.material.add_dust(scratch, strength=1.0, texture_scale=0.05)
+        group = next((n.node_tree for n in scratch.blender_obj.node_tree.nodes if n.type == "GROUP"), None)
+        bpy.data.materials.remove(scratch.blender_obj)
+
+        # the nodes fed by the "Dust strength" and "Texture scale" inputs get the per-object variation
+        def fed_by(socket_name):
+            return [l.to_node for l in group.links
+                    if l.from_node.type == "GROUP_INPUT" and l.from_socket.name == socket_name]
+
+        nodes, links = (group.nodes, group.links) if group is not None else ((), ())
+        group_input = next((n for n in nodes if n.type == "GROUP_INPUT"), None)
+        strength = mapping = None
+        if group_input is not None:
+            strength = next((n for n in fed_by("Dust strength") if n.type == "MATH" and n.operation == "MULTIPLY"
+                             and n.inputs[1].is_linked and n.inputs[1].links[0].from_node == group_input), None)
+            mapping = next((n for n in fed_by("Texture scale") if n.type == "MAPPING"), None)
+        if strength is None or mapping is None:
+            print("[warn] BlenderProc's dust node group has an unexpected layout; using per-material dust")
+            if group is not None:
+                bpy.data.node_groups.remove(group)
+            Weathering._dust_group_unsupported = True
+            return None
+        group.name = name
+        group.use_fake_user = True
+
+        info = nodes.new("ShaderNodeObjectInfo")
+        # per-object strength factor in [0.7, 1.3]
+        vary = nodes.new("ShaderNodeMapRange")
+        vary.inputs["To Min"].default_value = 0.7
+        vary.inputs["To Max"].default_value = 1.3
+        links.new(info.outputs["Random"], vary.inputs["Value"])
+        scaled = nodes.new("ShaderNodeMath")
+        scaled.operation = "MULTIPLY"
+        links.new(group_input.outputs["Dust strength"], scaled.inputs[0])
+        links.new(vary.outputs["Result"], scaled.inputs[1])
+        links.new(scaled.outputs["Value"], strength.inputs[1])
+        # per-object offset of the flake pattern
+        offset = nodes.new("ShaderNodeMath")
+        offset.operation = "MULTIPLY"
+        offset.inputs[1].default_value = 100.0
+        links.new(info.outputs["Random"], offset.inputs[0])
+        links.new(offset.outputs["Value"], mapping.inputs["Location"])
+        return group
+
+    def _add_shared_dust(self, bp_mat, strength, texture_scale):
+        group_node = bp_mat.new_node("ShaderNodeGroup")
+        group_node.node_tree = self._shared_dust_group()
+        node_connected_to_the_output, material_output = bp_mat.get_node_connected_to_the_output_and_unlink_it()
+        group_node.location = (material_output.location.x - 250, material_output.location.y + 250)
+        bp_mat.link(node_connected_to_the_output.outputs[0], group_node.inputs[0])
+        bp_mat.link(group_node.outputs[0], material_output.inputs["Surface"])
+        group_node.inputs["Dust strength"].default_value = strength
+        group_node.inputs["Texture scale"].default_value = [texture_scale] * 3
+
     # -- utils --
     def _diag(self, bpy_obj):
         d = bpy_obj.dimensions
         return float((d.x*d.x + d.y*d.y + d.z*d.z) ** 0.5)
 
+    def _keyed_rng(self, key):
+        # with a run seed, materials and pool entries look the same whichever scene creates them first
+        if self.base_seed is None:
+            return self.rng
+        return random.Random(f"{self.base_seed}:{key}")
+
+    def _record(self, bpy_obj, op, **params):
+        self.history.setdefault(bpy_obj.name, []).append({"op": op, **params})
+
     def _maybe_apply(self, bpy_obj, mod):
         if not self.apply_modifiers: return
         try:
             bpy.context.view_layer.objects.active = bpy_obj
             bpy.ops.object.modifier_apply(modifier=mod.name)
         except Exception:
-            pass
\ No newline at end of file
+            pass
@@ -0,0 +1,152 @@
+# weathering_variants.py
+import os
+import glob
+import json
+import random
+import bpy
+import numpy as np
+import blenderproc as bproc
+from typing import Dict, List, Tuple
+from weathering import Weathering
+from asset_cache import AssetCache
+
+VARIANTS_VERSION = 1
+
+
+class WeatheringVariants:
+    """
+    Pre-baked weathering deformations, so scenes do not evaluate modifiers.
+
+    bake() weathers every object of a category num_variants times (displace, simple deform,
+    lattice and axis scale, like Weathering at runtime), reads back the deformed vertex
+    positions and stores them in <variants_dir>/<category>.variants.npz. The sidecar
+    <category>.variants.json holds the source fingerprint (see AssetCache) and, per asset,
+    its asset_source, vertex count and the recorded parameters of every variant.
+
+    apply() writes one randomly chosen variant into each object's mesh with foreach_set.
+    The mesh itself is deformed, so nothing is evaluated per frame and BVHs built from it
+    see the weathered shape. Assets are matched by their asset_source custom property;
+    meshes whose vertex count differs from the baked one (e.g. a LOD level) are left alone.
+    """
+    def __init__(self, variants_dir: str):
+        self.variants_dir = str(variants_dir)
+        os.makedirs(self.variants_dir, exist_ok=True)
+        self.index: Dict[str, Tuple[str, int, int, int]] = {}  # asset_source -> (key, asset idx, n_vertices, n_variants)
+        self._arrays = {}
+        for meta_path in sorted(glob.glob(os.path.join(self.variants_dir, "*.variants.json"))):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            key = os.path.basename(meta_path)[:-len(".variants.json")]
+            for i, asset in enumerate(meta["assets"]):
+                self.index[asset["source"]] = (key, i, asset["n_vertices"], len(asset["variants"]))
+
+    # -------- paths --------
+    def _key(self, asset_dir: str) -> str:
+        return os.path.basename(os.path.normpath(asset_dir))
+
+    def data_path(self, asset_dir: str) -> str:
+        return os.path.join(self.variants_dir, self._key(asset_dir) + ".variants.npz")
+
+    def meta_path(self, asset_dir: str) -> str:
+        return os.path.join(self.variants_dir, self._key(asset_dir) + ".variants.json")
+
+    def is_valid(self, asset_dir: str, num_variants: int) -> bool:
+        try:
+            with open(self.meta_path(asset_dir), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (
+            os.path.exists(self.data_path(asset_dir))
+            and meta.get("version") == VARIANTS_VERSION
+            and meta.get("num_variants") == num_variants
+            and meta.get("fingerprint") == AssetCache.fingerprint(asset_dir)
+        )
+
+    # -------- build --------
+    def bake(self, asset_dir: str, objs: List[bproc.types.MeshObject], num_variants: int = 8, **weathering_kwargs):
+        """Bake num_variants deformed vertex sets for each object; weathering_kwargs go to Weathering(...)."""
+        weathering_kwargs = {**weathering_kwargs, "age_materials": False, "apply_modifiers": False}
+        arrays, assets = {}, []
+        for i, obj in enumerate(objs):
+            source = obj.get_cp("asset_source") if obj.has_cp("asset_source") else obj.get_name()
+            n = len(obj.blender_obj.data.vertices)
+            variants = []
+            for k in range(num_variants):
+                weathering = Weathering(**weathering_kwargs)
+                co = self._deformed_vertices(obj, weathering)
+                if co is None or len(co) != n:
+                    print(f"[warn] Weathering changed the topology of {source}, skipping variant {k}")
+                    continue
+                arrays[f"a{i}_v{len(variants)}"] = co
+                variants.append(weathering.history.get(obj.blender_obj.name, []))
+            assets.append({"source": source, "n_vertices": n, "variants": variants})
+
+        np.savez(self.data_path(asset_dir), **arrays)
+        meta = {
+            "version": VARIANTS_VERSION,
+            "fingerprint": AssetCache.fingerprint(asset_dir),
+            "num_variants": num_variants,
+            "weathering": weathering_kwargs,
+            "assets": assets,
+        }
+        with open(self.meta_path(asset_dir), "w") as f:
+            json.dump(meta, f, indent=2)
+        key = self._key(asset_dir)
+        self._arrays.pop(key, None)
+        for i, asset in enumerate(assets):
+            self.index[asset["source"]] = (key, i, asset["n_vertices"], len(asset["variants"]))
+        print(f"[info] Baked {num_variants} weathering variants of {len(objs)} assets from {asset_dir}")
+
+    @staticmethod
+    def _deformed_vertices(obj: bproc.types.MeshObject, weathering: Weathering):
+        """Local vertex positions of obj after weathering it with live modifiers; obj is restored afterwards."""
+        bpy_obj = obj.blender_obj
+        scale = np.array(bpy_obj.scale)
+        try:
+            weathering.apply_to_groups([[obj]])
+            bpy.context.view_layer.update()
+            evaluated = bpy_obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+            mesh = evaluated.to_mesh()
+            try:
+                co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+                mesh.vertices.foreach_get("co", co)
+            finally:
+                evaluated.to_mesh_clear()
+            # axis scaling changed the object scale; bake it into the vertices instead
+            return co.reshape(-1, 3) * (np.array(bpy_obj.scale) / scale).astype(np.float32)
+        finally:
+            Weathering.strip_groups([[obj]])
+            bpy_obj.scale = scale.tolist()
+            # per-variant textures and lattice data have no users left
+            for coll in (bpy.data.textures, bpy.data.lattices):
+                for block in [b for b in coll if b.name.startswith("wx_") and b.users == 0]:
+                    coll.remove(block)
+
+    # -------- runtime --------
+    def apply(self, groups, rng=random):
+        """
+        Deform every object that has baked variants with a random one of them (recorded in its
+        "weathering_variant" custom property). Returns (groups with variants, groups without).
+        """
+        baked, live = [], []
+        for group in groups:
+            done = [self._apply_variant(obj, rng) for obj in group]
+            (baked if all(done) else live).append(group)
+        return baked, live
+
+    def _apply_variant(self, obj: bproc.types.MeshObject, rng) -> bool:
+        entry = self.index.get(obj.get_cp("asset_source")) if obj.has_cp("asset_source") else None
+        if entry is None:
+            return False
+        key, i, n_vertices, n_variants = entry
+        mesh = obj.blender_obj.data
+        if n_variants == 0 or len(mesh.vertices) != n_vertices:
+            return False
+        if key not in self._arrays:
+            self._arrays[key] = np.load(os.path.join(self.variants_dir, key + ".variants.npz"))
+        k = rng.randrange(n_variants)
+        mesh.vertices.foreach_set("co", self._arrays[key][f"a{i}_v{k}"].ravel())
+        mesh.update()
+        obj.set_cp("weathering_variant", k)
+        return True